@@ -0,0 +1,44 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import sys
+import time
+import numpy as np
+from dezero import Variable
+
+# Variable.backward 스케줄러 벤치마크
+# chain: x -> -x -> -(-x) -> ... (깊은 그래프)
+# wide : x를 n개의 가지로 fan-out 한 뒤 이진 트리로 다시 더함 (대기 함수가 많은 그래프)
+
+def build_chain(n):
+    x = Variable(np.array(1.0))
+    y = x
+    for _ in range(n):
+        y = -y
+    return x, y
+
+def build_wide(n):
+    x = Variable(np.array(1.0))
+    hs = [-x for _ in range(n)]
+    while len(hs) > 1:
+        hs = [hs[i] + hs[i + 1] if i + 1 < len(hs) else hs[i]
+              for i in range(0, len(hs), 2)]
+    return x, hs[0]
+
+def bench(name, build, n):
+    x, y = build(n)
+    start = time.perf_counter()
+    y.backward()
+    elapsed = time.perf_counter() - start
+    print('{:5s} n={:>8d}  backward: {:8.3f} s  ({:,.0f} nodes/s)'.format(
+        name, n, elapsed, n / elapsed))
+    return x
+
+if __name__ == '__main__':
+    sizes = [int(s) for s in sys.argv[1:]] or [10000, 100000, 1000000]
+
+    for n in sizes:
+        bench('chain', build_chain, n)
+    for n in sizes:
+        bench('wide', build_wide, n)
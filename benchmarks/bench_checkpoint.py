@@ -0,0 +1,47 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import numpy as np
+from dezero.models import MLP
+import dezero.functions as F
+from dezero import pool
+
+# 깊은 MLP에서 gradient checkpointing의 활성화 메모리 / 시간 비교
+# peak alloc은 파라미터와 기울기를 제외한 한 스텝(forward + backward)의 추가 메모리
+
+def step(model, x, t):
+    y = model(x)
+    loss = F.softmax_cross_entropy(y, t)
+    model.cleargrads()
+    loss.backward()
+
+def bench(depth, width=512, batch_size=512):
+    x = np.random.randn(batch_size, width).astype(np.float32)
+    t = np.random.randint(0, 10, batch_size)
+    act = 2 * batch_size * width * 4 # 층 하나의 활성화 bytes (추정)
+
+    for name, budget in (('none', None), ('budget=sqrt', 1), ('budget=depth/4', act * depth // 4)):
+        np.random.seed(0)
+        model = MLP((width,) * depth + (10,), activation=F.tanh)
+        model.checkpoint(memory_budget=budget)
+        step(model, x, t) # 가중치 초기화 + 기울기 할당
+
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        step(model, x, t)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+        segments = model._segment_plan[1] if budget is not None else None
+        print('depth={:3d} {:15s} segments={:3d}  peak alloc: {:7.1f} MB  step: {:7.1f} ms'.format(
+            depth, name, len(segments) if segments else 0, peak / 2**20, elapsed * 1e3))
+
+if __name__ == '__main__':
+    # pool이 재사용하는 버퍼는 tracemalloc에 새 할당으로 잡히지 않으므로 끄고 측정
+    pool.default_pool.enabled = False
+    for depth in (16, 64):
+        bench(depth)
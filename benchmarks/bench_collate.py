@@ -0,0 +1,45 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import numpy as np
+import dezero
+from dezero.dataloaders import DataLoader
+
+# DataLoader 1 에폭 처리량: 예제별 __getitem__ + np.array 수집과 get_batch(배치 인덱싱) 비교
+
+class RandomMNIST(dezero.datasets.MNIST):
+    def prepare(self): # 다운로드할 수 없을 때: MNIST와 같은 형태의 uint8 데이터
+        rng = np.random.RandomState(0)
+        self.data = rng.randint(0, 256, (60000, 1, 28, 28)).astype(np.uint8)
+        self.label = rng.randint(0, 10, 60000).astype(np.uint8)
+
+def load_mnist():
+    try:
+        return dezero.datasets.MNIST(train=True), 'MNIST'
+    except Exception:
+        return RandomMNIST(), 'random MNIST-sized data (download failed)'
+
+def epoch(loader):
+    start = time.perf_counter()
+    count = 0
+    for x, t in loader:
+        count += len(t)
+    return count / (time.perf_counter() - start)
+
+def bench(name, dataset, batch_size):
+    per_example = DataLoader(dataset, batch_size)
+    per_example.batch_indexable = False # 예제별 경로를 강제
+    batched = DataLoader(dataset, batch_size)
+    a, b = epoch(per_example), epoch(batched)
+    print('{:8s} batch {:4d}: per-example {:10.0f} samples/s  batched {:10.0f} samples/s  x{:5.1f}'
+          .format(name, batch_size, a, b, b / a))
+
+if __name__ == '__main__':
+    train_set, name = load_mnist()
+    print('dataset: {}'.format(name))
+    for batch_size in (32, 100, 1000):
+        bench('MNIST', train_set, batch_size)
+    for batch_size in (10, 30):
+        bench('Spiral', dezero.datasets.Spiral(), batch_size)
@@ -0,0 +1,46 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import os
+import numpy as np
+import dezero
+from dezero import optimizers
+from dezero.models import MLP
+from dezero.distributed import DataParallelTrainer
+import dezero.functions as F
+
+# steps/step51.py의 MNIST MLP를 프로세스 1, 2, 4, 8개로 데이터 병렬 학습했을 때의 처리량
+# MNIST를 받을 수 없는 환경에서는 같은 크기의 임의 데이터를 쓴다
+
+class RandomMNIST(dezero.datasets.Dataset):
+    def prepare(self):
+        rng = np.random.RandomState(0)
+        self.data = rng.rand(60000, 784).astype(np.float32)
+        self.label = rng.randint(0, 10, 60000)
+
+def load_mnist():
+    try:
+        return dezero.datasets.MNIST(train=True), 'MNIST'
+    except Exception:
+        return RandomMNIST(), 'random MNIST-sized data (download failed)'
+
+def bench(train_set, n_workers, batch_size=100, hidden_size=1000, max_epoch=1):
+    np.random.seed(0)
+    model = MLP((hidden_size, 10), activation=F.relu)
+    optimizer = optimizers.SGD().setup(model)
+    trainer = DataParallelTrainer(model, optimizer, n_workers=n_workers)
+    history = trainer.fit(train_set, batch_size * n_workers, max_epoch=max_epoch)
+    assert len(set(trainer.checksums)) == 1 # 모든 worker의 매개변수가 같다
+    return history[-1]
+
+if __name__ == '__main__':
+    train_set, name = load_mnist()
+    print('dataset: {}, cpus: {}'.format(name, os.cpu_count()))
+    base = None
+    for n_workers in (1, 2, 4, 8):
+        result = bench(train_set, n_workers)
+        base = base or result['samples_per_sec']
+        print('processes={}  {:9.1f} samples/s  ({:4.2f}x)  loss: {:.4f}  epoch: {:6.2f} s'.format(
+            n_workers, result['samples_per_sec'], result['samples_per_sec'] / base,
+            result['loss'], result['time']))
@@ -0,0 +1,69 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import os
+import time
+import numpy as np
+import dezero
+import dezero.functions as F
+from dezero import optimizers
+from dezero.models import MLP
+from dezero.dataloaders import DataLoader
+
+# MNIST에서 DataLoader 단독 처리량과 학습과 겹쳐 돌렸을 때의 처리량 (samples/sec)
+
+class RandomMNIST(dezero.datasets.MNIST):
+    def prepare(self): # 다운로드할 수 없을 때: MNIST와 같은 형태의 uint8 데이터
+        rng = np.random.RandomState(0)
+        self.data = rng.randint(0, 256, (60000, 1, 28, 28)).astype(np.uint8)
+        self.label = rng.randint(0, 10, 60000).astype(np.uint8)
+
+def load_mnist():
+    try:
+        return dezero.datasets.MNIST(train=True), 'MNIST'
+    except Exception:
+        return RandomMNIST(), 'random MNIST-sized data (download failed)'
+
+def loader_only(loader, max_iter):
+    start = time.perf_counter()
+    count = 0
+    for i, (x, t) in enumerate(loader):
+        count += len(t)
+        if i + 1 == max_iter:
+            break
+    return count / (time.perf_counter() - start)
+
+def with_training(loader, max_iter):
+    np.random.seed(0)
+    model = MLP((1000, 10))
+    optimizer = optimizers.SGD().setup(model)
+    start = time.perf_counter()
+    count = 0
+    for i, (x, t) in enumerate(loader):
+        loss = F.softmax_cross_entropy(model(x), t)
+        model.cleargrads()
+        loss.backward()
+        optimizer.update()
+        count += len(t)
+        if i + 1 == max_iter:
+            break
+    return count / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    train_set, name = load_mnist()
+    print('dataset: {}, cpus: {}'.format(name, os.cpu_count()))
+    configs = [('sync', dict()),
+               ('1 process', dict(num_workers=1)),
+               ('2 processes', dict(num_workers=2)),
+               ('4 processes', dict(num_workers=4)),
+               ('2 threads', dict(num_workers=2, multiprocess=False))]
+    max_iter = 200
+    for label, kwargs in configs:
+        loader = DataLoader(train_set, 100, seed=0, **kwargs)
+        alone = loader_only(loader, max_iter)
+        loader.reset()
+        overlapped = with_training(loader, max_iter)
+        loader.close()
+        print('{:12s} loader {:9.0f} samples/s   with training {:8.0f} samples/s'.format(
+            label, alone, overlapped))
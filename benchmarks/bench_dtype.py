@@ -0,0 +1,63 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import warnings
+import numpy as np
+import dezero
+from dezero import optimizers, Config
+from dezero.models import MLP
+import dezero.functions as F
+
+# float64 / float32 / float16 보관(loss scaling)별 학습 스텝 시간과 dtype 승격 감사
+
+def train(dtype, storage_dtype, batch_size, iters, in_size=784, hidden_sizes=(1000, 10)):
+    Config.dtype, Config.storage_dtype = dtype, storage_dtype
+    np.random.seed(0)
+    model = MLP(hidden_sizes)
+    optimizer = optimizers.SGD(0.1).setup(model)
+    scaler = optimizers.LossScaler() if storage_dtype is not None else None
+    x = np.random.randn(batch_size, in_size).astype(storage_dtype or dtype)
+    t = np.random.randint(0, hidden_sizes[-1], batch_size)
+
+    for i in range(iters + 5):
+        if i == 5:
+            start = time.perf_counter()
+        y = model(x)
+        loss = F.softmax_cross_entropy(y, t)
+        model.cleargrads()
+        if scaler is None:
+            loss.backward()
+            optimizer.update()
+        else:
+            scaler.backward(loss)
+            scaler.step(optimizer)
+    elapsed = (time.perf_counter() - start) / iters
+    Config.dtype, Config.storage_dtype = np.float32, None
+    return elapsed, y.dtype, model.l0.W.grad.dtype
+
+def audit(batch_size=100, in_size=784):
+    # 사용자가 넘긴 float64 데이터가 float32 모델을 통째로 승격시키는 것을 보고
+    np.random.seed(0)
+    model = MLP((1000, 10))
+    x = np.random.randn(batch_size, in_size)
+    dezero.core.dtype_promotions.clear()
+    with dezero.using_config('debug_dtype', True), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        F.softmax_cross_entropy(model(x), np.zeros(batch_size, dtype=np.int64))
+    print('promotions with float64 input:')
+    for name, in_dtypes, out_dtype in dezero.core.dtype_promotions:
+        print('  {:20s} {} -> {}'.format(name, in_dtypes, out_dtype))
+
+if __name__ == '__main__':
+    for batch_size in (100, 256):
+        for dtype, storage in ((np.float64, None), (np.float32, None),
+                               (np.float32, np.float16)):
+            elapsed, y_dtype, g_dtype = train(dtype, storage, batch_size, 50)
+            print('batch={} dtype={:8s} storage={:8s} step: {:6.2f} ms  '
+                  'activations: {}  grads: {}'.format(
+                batch_size, np.dtype(dtype).name,
+                np.dtype(storage).name if storage else '-',
+                elapsed * 1e3, y_dtype, g_dtype))
+    audit()
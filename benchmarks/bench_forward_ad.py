@@ -0,0 +1,66 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import numpy as np
+import dezero
+from dezero import Variable
+import dezero.functions as F
+
+# 방향 도함수 / 헤시안-벡터 곱 비용: forward-mode(jvp, hvp)와 double backward 비교
+# f(x) = sum(tanh(tanh(...tanh(x W)...))) (depth층)
+
+def make_f(depth, size):
+    np.random.seed(0)
+    Ws = [Variable(np.random.randn(size, size) / np.sqrt(size)) for _ in range(depth)]
+
+    def f(x):
+        for W in Ws:
+            x = F.tanh(F.matmul(x, W))
+        return F.sum(x)
+    return f
+
+def timeit(fn, iters=20):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return (time.perf_counter() - start) / iters
+
+def double_backward_hvp(f, x, v):
+    x = Variable(x)
+    y = f(x)
+    y.backward(create_graph=True)
+    gx = x.grad
+    x.cleargrad()
+    F.sum(gx * v).backward()
+    return x.grad.data
+
+def bench(depth, size=256, batch=32):
+    f = make_f(depth, size)
+    x = np.random.randn(batch, size)
+    v = np.random.randn(batch, size)
+
+    def forward():
+        with dezero.no_grad():
+            f(Variable(x))
+
+    def grad():
+        y = f(Variable(x))
+        y.backward()
+
+    t_forward = timeit(forward)
+    results = [('forward', t_forward),
+               ('jvp', timeit(lambda: dezero.jvp(f, x, v))),
+               ('backward', timeit(grad)),
+               ('hvp (forward-over-reverse)', timeit(lambda: dezero.hvp(f, x, v))),
+               ('hvp (double backward)', timeit(lambda: double_backward_hvp(f, x, v)))]
+    assert np.allclose(dezero.hvp(f, x, v)[2], double_backward_hvp(f, x, v))
+    print('depth={}'.format(depth))
+    for name, t in results:
+        print('  {:28s} {:8.2f} ms  ({:4.1f}x forward)'.format(name, t * 1e3, t / t_forward))
+
+if __name__ == '__main__':
+    bench(4)
+    bench(16)
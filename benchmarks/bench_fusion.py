@@ -0,0 +1,49 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import numpy as np
+from dezero import Parameter
+from dezero.static import Tape
+import dezero.functions as F
+from dezero import pool
+
+# 원소별 연산 체인 융합 벤치마크 (큰 활성화 텐서)
+# Tape(fuse=False) / Tape(fuse=True) 의 forward + backward 재생 시간과 최대 메모리 비교
+
+def sigmoid(x):
+    return F.sum(F.sigmoid_simple(x))
+
+def rosenbrock(x0, x1):
+    return F.sum(100 * (x1 - x0 ** 2) ** 2 + (x0 - 1) ** 2)
+
+def polynomial(x):
+    return F.sum(x ** 4 - 2 * x ** 2 + 3 * x - 1)
+
+def bench(name, fn, shape, fuse, repeat=10):
+    xs = [Parameter(np.random.rand(*shape)) for _ in range(fn.__code__.co_argcount)]
+    tape = Tape(fn(*xs), fuse=fuse)
+    tape.forward()
+    tape.backward()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        tape.forward()
+        tape.backward()
+    elapsed = (time.perf_counter() - start) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('{:10s} fuse={!s:5s} entries={:2d}  step: {:7.2f} ms  peak alloc: {:7.1f} MB'.format(
+        name, fuse, len(tape.entries), elapsed * 1e3, peak / 2**20))
+
+if __name__ == '__main__':
+    # pool이 재사용하는 버퍼는 tracemalloc에 새 할당으로 잡히지 않으므로 끄고 측정
+    pool.default_pool.enabled = False
+    shape = (1000, 1000)
+    for name, fn in (('sigmoid', sigmoid), ('rosenbrock', rosenbrock),
+                     ('polynomial', polynomial)):
+        bench(name, fn, shape, False)
+        bench(name, fn, shape, True)
@@ -0,0 +1,68 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import numpy as np
+from dezero import Variable
+import dezero.functions as F
+
+# fan-in 기울기 누적 벤치마크
+# create_graph=True  : x.grad + gx (Add 함수 호출, 새 Variable / 배열 생성)
+# create_graph=False : 변수별 버퍼에 in-place 누적
+
+def shared_weight(x, W, depth=50):
+    # 같은 W를 depth번 재사용 -> W.grad에 depth개의 기울기가 모인다
+    h = x
+    for _ in range(depth):
+        h = F.tanh(F.matmul(h, W))
+    return F.sum(h)
+
+def residual(x, W, depth=50):
+    # h = h + f(h) -> 각 h에 기울기 두 개가 모인다
+    h = x
+    for _ in range(depth):
+        h = h + F.tanh(F.matmul(h, W))
+    return F.sum(h)
+
+class CountVariables:
+    # backward 중에 생성되는 Variable 수를 센다
+    def __enter__(self):
+        self.count = 0
+        self.init = Variable.__init__
+
+        def init(v, *args, **kwargs):
+            self.count += 1
+            self.init(v, *args, **kwargs)
+        Variable.__init__ = init
+        return self
+
+    def __exit__(self, *args):
+        Variable.__init__ = self.init
+
+def bench(name, model, size, create_graph, repeat=10):
+    x = Variable(np.random.randn(size, size))
+    W = Variable(np.random.randn(size, size) * 0.05)
+    elapsed, peak = 0.0, 0
+    for _ in range(repeat):
+        y = model(x, W)
+        x.cleargrad()
+        W.cleargrad()
+        tracemalloc.start()
+        with CountVariables() as counter:
+            start = time.perf_counter()
+            y.backward(create_graph=create_graph)
+            elapsed += time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    print('{:13s} size={:4d} create_graph={!s:5s}  backward: {:7.2f} ms  '
+          'Variables: {:5d}  peak alloc: {:8.2f} MB'.format(
+        name, size, create_graph, elapsed / repeat * 1e3, counter.count,
+        peak / 2**20))
+
+if __name__ == '__main__':
+    for size in (16, 256):
+        for name, model in (('shared_weight', shared_weight), ('residual', residual)):
+            bench(name, model, size, True)
+            bench(name, model, size, False)
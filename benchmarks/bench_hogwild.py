@@ -0,0 +1,56 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import os
+import numpy as np
+import dezero
+from dezero import optimizers
+from dezero.models import MLP
+from dezero.distributed import HogwildTrainer
+import dezero.functions as F
+
+# Hogwild 학습의 프로세스 수별 처리량 / staleness (spiral, MNIST 크기 MLP)
+# MNIST를 받을 수 없는 환경에서는 같은 크기의 임의 데이터를 쓴다
+
+class RandomMNIST(dezero.datasets.Dataset):
+    def prepare(self):
+        rng = np.random.RandomState(0)
+        self.data = rng.rand(20000, 784).astype(np.float32)
+        self.label = rng.randint(0, 10, 20000)
+
+def load_mnist():
+    try:
+        return dezero.datasets.MNIST(train=True), 'MNIST'
+    except Exception:
+        return RandomMNIST(), 'random MNIST-sized data'
+
+def evaluate(model, dataset):
+    x = np.array([dataset[i][0] for i in range(len(dataset))])
+    t = np.array([dataset[i][1] for i in range(len(dataset))])
+    with dezero.no_grad():
+        return float(F.accuracy(model(x), t).data)
+
+def bench(name, dataset, hidden_sizes, lr, batch_size, max_epoch):
+    base = None
+    for n_workers in (1, 2, 4, 8):
+        np.random.seed(0)
+        model = MLP(hidden_sizes)
+        optimizer = optimizers.SGD(lr).setup(model)
+        result = HogwildTrainer(model, optimizer, n_workers).fit(
+            dataset, batch_size, max_epoch=max_epoch)
+        base = base or result['samples_per_sec']
+        workers = result['workers']
+        print('{} processes={}  {:9.1f} samples/s ({:4.2f}x)  per worker: {:8.1f}  '
+              'staleness mean/max: {:5.2f}/{:3d}  loss: {:.4f}  accuracy: {:.3f}'.format(
+            name, n_workers, result['samples_per_sec'], result['samples_per_sec'] / base,
+            np.mean([w['samples_per_sec'] for w in workers]),
+            np.mean([w['staleness_mean'] for w in workers]),
+            max(w['staleness_max'] for w in workers), result['loss'],
+            evaluate(model, dataset)))
+
+if __name__ == '__main__':
+    print('cpus:', os.cpu_count())
+    bench('spiral', dezero.datasets.Spiral(), (10, 3), 1.0, 10, 100)
+    mnist, name = load_mnist()
+    bench(name, mnist, (1000, 10), 0.1, 100, 1)
@@ -0,0 +1,71 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import math
+import time
+import numpy as np
+import dezero.functions as F
+from dezero import optimizers
+from dezero.models import MLP
+
+# weight decay + global norm clipping을 건 optimizer.update() 1회 시간
+# 직접 작성한 매개변수별 루프 hook / 내장 hook / flat 모드에서 갱신과 함께 실행
+
+def loop_weight_decay(rate):
+    def hook(params):
+        for param in params:
+            param.grad = optimizers.Variable(param.grad.data + rate * param.data)
+    return hook
+
+def loop_clip_grad(max_norm):
+    def hook(params):
+        total_norm = 0
+        for param in params:
+            total_norm += (param.grad.data ** 2).sum()
+        rate = max_norm / (math.sqrt(float(total_norm)) + 1e-6)
+        if rate < 1:
+            for param in params:
+                param.grad = optimizers.Variable(param.grad.data * np.float32(rate))
+    return hook
+
+def build(n_layers, width):
+    np.random.seed(0)
+    model = MLP((width,) * n_layers + (10,))
+    x = np.random.randn(32, width).astype(np.float32)
+    t = np.random.randint(0, 10, 32)
+    model.cleargrads()
+    F.softmax_cross_entropy(model(x), t).backward()
+    return model
+
+def bench(mode, n_layers, width, steps=50):
+    model = build(n_layers, width)
+    optimizer = optimizers.MomentumSGD().setup(model, flat=(mode == 'flat'))
+    if mode == 'loop':
+        optimizer.add_hook(loop_weight_decay(1e-4))
+        optimizer.add_hook(loop_clip_grad(0.1))
+    else:
+        optimizer.add_hook(optimizers.WeightDecay(1e-4))
+        optimizer.add_hook(optimizers.ClipGradByGlobalNorm(0.1))
+    # hook이 param.grad를 교체하므로 매 스텝 같은 기울기에서 시작 (모든 방식에 같은 비용)
+    params = list(model.params())
+    grads = [p.grad for p in params]
+    def step():
+        for param, grad in zip(params, grads):
+            param.grad = grad
+        optimizer.update()
+    step()
+    start = time.perf_counter()
+    for _ in range(steps):
+        step()
+    elapsed = (time.perf_counter() - start) / steps
+    return elapsed, [p.data.copy() for p in model.params()]
+
+for n_layers, width in [(200, 16), (500, 8), (20, 256)]:
+    print('MLP {} x {} ({} parameter arrays)'.format(n_layers, width, 2 * (n_layers + 1)))
+    results = {mode: bench(mode, n_layers, width) for mode in ['loop', 'builtin', 'flat']}
+    t_loop, p_loop = results['loop']
+    for mode, (t, p) in results.items():
+        diff = max(np.abs(a - b).max() for a, b in zip(p_loop, p))
+        print('  {:8s} {:8.3f} ms  x{:5.1f}  max diff {:.1e}'.format(
+            mode, t * 1e3, t_loop / t, diff))
@@ -0,0 +1,42 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import numpy as np
+import dezero
+from dezero.models import MLP
+
+# eager model(x) (no_grad)와 compile_inference() 결과의 배치 크기별 지연 시간
+
+def latency(f, x, iters):
+    for _ in range(10):
+        f(x)
+    start = time.perf_counter()
+    for _ in range(iters):
+        f(x)
+    return (time.perf_counter() - start) / iters
+
+def bench(hidden_sizes, in_size=784):
+    np.random.seed(0)
+    model = MLP(hidden_sizes)
+    model(np.zeros((1, in_size), dtype=np.float32))
+    predict = model.compile_inference()
+
+    def eager(x):
+        with dezero.no_grad():
+            return model(x).data
+
+    for batch_size in (1, 8, 256):
+        x = np.random.randn(batch_size, in_size).astype(np.float32)
+        assert np.allclose(eager(x), predict(x), atol=1e-5)
+        iters = 2000 if batch_size < 256 else 200
+        t_eager = latency(eager, x, iters)
+        t_compiled = latency(predict, x, iters)
+        print('MLP{} batch={:3d}  eager: {:8.1f} us  compiled: {:8.1f} us  '
+              'speedup: {:4.1f}x'.format(hidden_sizes, batch_size, t_eager * 1e6,
+                                         t_compiled * 1e6, t_eager / t_compiled))
+
+if __name__ == '__main__':
+    bench((100, 10))
+    bench((1000, 1000, 10))
@@ -0,0 +1,46 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import sys
+import time
+import tracemalloc
+import numpy as np
+from dezero import Variable
+
+# 그래프 노드(Variable + Function) 하나당 메모리와 forward / backward 처리량 측정
+# x -> -x -> -(-x) -> ... 로 노드 n개짜리 체인을 만든다
+
+def build_chain(x, n):
+    y = x
+    for _ in range(n):
+        y = -y
+    return y
+
+def bytes_per_node(n):
+    x = Variable(np.array(1.0))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    y = build_chain(x, n)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / n
+
+def ops_per_sec(n):
+    x = Variable(np.array(1.0))
+    start = time.perf_counter()
+    y = build_chain(x, n)
+    forward = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    y.backward()
+    backward = n / (time.perf_counter() - start)
+    return forward, backward
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print('bytes/node  : {:,.1f}'.format(bytes_per_node(n)))
+    forward, backward = ops_per_sec(n)
+    print('forward     : {:,.0f} ops/s'.format(forward))
+    print('backward    : {:,.0f} ops/s'.format(backward))
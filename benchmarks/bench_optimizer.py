@@ -0,0 +1,42 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import numpy as np
+import dezero.functions as F
+from dezero import optimizers
+from dezero.models import MLP
+
+# 작은 층이 많은 모델에서 optimizer.update() 1회 시간: 매개변수별 갱신과 flat 버퍼 갱신 비교
+
+def build(n_layers, width):
+    np.random.seed(0)
+    model = MLP((width,) * n_layers + (10,))
+    x = np.random.randn(32, width).astype(np.float32)
+    t = np.random.randint(0, 10, 32)
+    model.cleargrads()
+    F.softmax_cross_entropy(model(x), t).backward()
+    return model
+
+def bench(optimizer_cls, n_layers, width, flat, steps=50):
+    model = build(n_layers, width)
+    optimizer = optimizer_cls().setup(model, flat=flat)
+    optimizer.update() # 상태 버퍼 할당은 측정에서 제외
+    start = time.perf_counter()
+    for _ in range(steps):
+        optimizer.update()
+    elapsed = (time.perf_counter() - start) / steps
+    return elapsed, [p.data.copy() for p in model.params()]
+
+for n_layers, width in [(200, 16), (500, 8), (20, 256)]:
+    n_params = 2 * (n_layers + 1)
+    print('MLP {} x {} ({} parameter arrays)'.format(n_layers, width, n_params))
+    for cls in [optimizers.SGD, optimizers.MomentumSGD, optimizers.AdaGrad,
+                optimizers.Adam]:
+        t0, p0 = bench(cls, n_layers, width, flat=False)
+        t1, p1 = bench(cls, n_layers, width, flat=True)
+        diff = max(np.abs(a - b).max() for a, b in zip(p0, p1))
+        print('  {:12s} per-param {:8.3f} ms  flat {:8.3f} ms  x{:5.1f}  '
+              'max diff {:.1e}'.format(cls.__name__, t0 * 1e3, t1 * 1e3,
+                                       t0 / t1, diff))
@@ -0,0 +1,58 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import os
+import time
+import numpy as np
+import dezero
+import dezero.functions as F
+import dezero.layers as L
+
+# 여러 head를 가진 모델의 backward 시간: 순차 / 스레드 풀 (Config.backward_threads)
+# x -> 공유 Linear -> head n개 (Linear 2층) -> 손실 합
+
+def build(n_heads, hidden, in_size=512, classes=10):
+    np.random.seed(0)
+    shared = L.Linear(hidden, in_size=in_size)
+    heads = [(L.Linear(hidden, in_size=hidden), L.Linear(classes, in_size=hidden))
+             for _ in range(n_heads)]
+    params = list(shared.params()) + [p for l1, l2 in heads
+                                      for l in (l1, l2) for p in l.params()]
+
+    def loss_fn(x, t):
+        h = F.relu(shared(x))
+        loss = 0
+        for l1, l2 in heads:
+            loss = loss + F.softmax_cross_entropy(l2(F.relu(l1(h))), t)
+        return loss
+    return loss_fn, params
+
+def bench(n_heads, hidden, batch_size=256, iters=10):
+    loss_fn, params = build(n_heads, hidden)
+    x = np.random.randn(batch_size, 512).astype(np.float32)
+    t = np.random.randint(0, 10, batch_size)
+    results = []
+    for threads in (0, 2, 4):
+        with dezero.using_config('backward_threads', threads):
+            elapsed = 0
+            for i in range(iters + 1):
+                for p in params:
+                    p.cleargrad()
+                loss = loss_fn(x, t)
+                start = time.perf_counter()
+                loss.backward()
+                if i: # 첫 회는 스레드 풀 생성 포함
+                    elapsed += time.perf_counter() - start
+            results.append((threads, elapsed / iters,
+                            [p.grad.data.copy() for p in params]))
+    base = results[0]
+    for threads, elapsed, grads in results:
+        assert all(np.allclose(a, b, atol=1e-5) for a, b in zip(base[2], grads))
+        print('heads={} hidden={} threads={}  backward: {:7.2f} ms  ({:4.2f}x)'.format(
+            n_heads, hidden, threads, elapsed * 1e3, base[1] / elapsed))
+
+if __name__ == '__main__':
+    print('cpus:', os.cpu_count())
+    bench(4, 512)
+    bench(8, 1024)
@@ -0,0 +1,43 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import numpy as np
+import dezero.functions as F
+from dezero import optimizers, Layer
+from dezero.models import MLP
+
+# 깊은 모델에서 cleargrads + optimizer.update() 1회의 매개변수 순회 비용
+# cached: named_params 캐시 사용 / rebuild: 매 호출마다 Layer 트리를 다시 순회
+
+def build(n_layers, width=4):
+    np.random.seed(0)
+    model = MLP((width,) * n_layers)
+    x = np.random.randn(2, width).astype(np.float32)
+    F.sum(model(x)).backward()
+    return model
+
+def bench(model, rebuild, steps=100):
+    optimizer = optimizers.SGD(lr=0.).setup(model)
+    grads = [p.grad for p in model.params()]
+    start = time.perf_counter()
+    for _ in range(steps):
+        if rebuild:
+            Layer._version += 1
+        model.cleargrads()
+        for param, grad in zip(model.params(), grads):
+            param.grad = grad
+        if rebuild:
+            Layer._version += 1
+        optimizer.update()
+    return (time.perf_counter() - start) / steps
+
+for n_layers in [100, 500, 1000]:
+    model = build(n_layers)
+    t_rebuild = bench(model, rebuild=True)
+    t_cached = bench(model, rebuild=False)
+    print('MLP depth {:5d}: rebuild {:7.3f} ms  cached {:7.3f} ms  x{:4.1f}'.format(
+        n_layers, t_rebuild * 1e3, t_cached * 1e3, t_rebuild / t_cached))
+
+print('order:', [key for key, _ in build(3).named_params()])
@@ -0,0 +1,49 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import numpy as np
+from dezero.models import MLP
+from dezero.per_example import per_example_grads
+import dezero.functions as F
+
+# 예제별 기울기: 예제 N개를 하나씩 backward하는 루프와 배치 backward 한 번 비교
+
+def loop(model, params, x, t):
+    grads = [np.empty((len(x),) + p.shape, dtype=p.dtype) for p in params]
+    for n in range(len(x)):
+        model.cleargrads()
+        loss = F.softmax_cross_entropy(model(x[n:n + 1]), t[n:n + 1])
+        loss.backward()
+        for g, p in zip(grads, params):
+            g[n] = p.grad.data
+    return grads
+
+def batched(model, params, x, t):
+    model.cleargrads()
+    loss = F.softmax_cross_entropy(model(x), t)
+    return per_example_grads(loss, params)
+
+def bench(hidden_sizes, batch_size, in_size=100):
+    np.random.seed(0)
+    model = MLP(hidden_sizes)
+    x = np.random.randn(batch_size, in_size).astype(np.float32)
+    t = np.random.randint(0, hidden_sizes[-1], batch_size)
+    model(x)
+    params = list(model.params())
+
+    times = []
+    for fn in (loop, batched):
+        start = time.perf_counter()
+        grads = fn(model, params, x, t)
+        times.append(time.perf_counter() - start)
+    assert all(np.allclose(a, b, atol=1e-5) for a, b in
+               zip(loop(model, params, x, t), batched(model, params, x, t)))
+    print('MLP{} N={:4d}  loop: {:8.1f} ms  batched: {:7.1f} ms  speedup: {:5.1f}x'.format(
+        hidden_sizes, batch_size, times[0] * 1e3, times[1] * 1e3, times[0] / times[1]))
+
+if __name__ == '__main__':
+    for batch_size in (32, 256):
+        bench((100, 10), batch_size)
+        bench((256, 256, 10), batch_size)
@@ -0,0 +1,45 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import numpy as np
+from dezero import optimizers, pool
+from dezero.models import MLP
+import dezero.functions as F
+
+# 버퍼 풀 사용 여부에 따른 학습 스텝 시간과 풀 적중률
+
+def train(hidden_sizes, batch_size, in_size, iters):
+    np.random.seed(0)
+    model = MLP(hidden_sizes, activation=F.sigmoid)
+    optimizer = optimizers.SGD(0.1).setup(model)
+    x = np.random.randn(batch_size, in_size).astype(np.float32)
+    t = np.random.randint(0, hidden_sizes[-1], batch_size)
+
+    for i in range(iters + 5):
+        if i == 5: # 처음 몇 스텝은 워밍업
+            pool.default_pool.reset_stats()
+            start = time.perf_counter()
+        y = model(x)
+        loss = F.softmax_cross_entropy(y, t)
+        model.cleargrads()
+        loss.backward()
+        optimizer.update()
+    return (time.perf_counter() - start) / iters
+
+def bench(hidden_sizes, batch_size, in_size=784, iters=100):
+    for enabled in (False, True):
+        pool.default_pool.enabled = enabled
+        elapsed = train(hidden_sizes, batch_size, in_size, iters)
+        stats = pool.default_pool.stats()
+        print('MLP{} batch={} pool={!s:5s}  step: {:6.2f} ms  hit rate: {:5.1%}  '
+              'reused: {:8.1f} MB/step  allocated: {:6.1f} MB/step'.format(
+            hidden_sizes, batch_size, enabled, elapsed * 1e3, stats['hit_rate'],
+            stats['bytes_reused'] / iters / 2**20,
+            stats['bytes_allocated'] / iters / 2**20))
+    pool.default_pool.enabled = True
+
+if __name__ == '__main__':
+    bench((1000, 10), 100)
+    bench((1000, 1000, 10), 256)
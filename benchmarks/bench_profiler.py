@@ -0,0 +1,52 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import dezero
+from dezero import optimizers
+from dezero.models import MLP
+import dezero.functions as F
+
+# 프로파일러 비활성 / 활성 시 학습 스텝 시간과 프로파일 결과 예시
+# usage: python bench_profiler.py [trace.json 경로] (기본: 임시 디렉터리)
+
+def step(model, optimizer, x, t):
+    loss = F.softmax_cross_entropy(model(x), t)
+    model.cleargrads()
+    loss.backward()
+    optimizer.update()
+
+def bench(trace_path, batch_size=32, iters=300):
+    np.random.seed(0)
+    model = MLP((100, 100, 10))
+    optimizer = optimizers.SGD().setup(model)
+    x = np.random.randn(batch_size, 64).astype(np.float32)
+    t = np.random.randint(0, 10, batch_size)
+    step(model, optimizer, x, t)
+
+    start = time.perf_counter()
+    for _ in range(iters):
+        step(model, optimizer, x, t)
+    disabled = (time.perf_counter() - start) / iters
+
+    with dezero.profiler.profile() as prof:
+        start = time.perf_counter()
+        for _ in range(iters):
+            step(model, optimizer, x, t)
+        enabled = (time.perf_counter() - start) / iters
+
+    print('step  disabled: {:7.1f} us  enabled: {:7.1f} us  ({} events)'.format(
+        disabled * 1e6, enabled * 1e6, len(prof.events)))
+    print(prof.summary())
+    print('chrome trace:', prof.export_chrome_trace(trace_path))
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        bench(sys.argv[1])
+    else:
+        bench(os.path.join(tempfile.gettempdir(), 'trace.json'))
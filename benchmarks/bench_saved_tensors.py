@@ -0,0 +1,49 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import tracemalloc
+import numpy as np
+import dezero
+from dezero import utils
+from dezero.models import MLP
+import dezero.functions as F
+from dezero import pool
+
+# 깊은 MLP 한 스텝에서 그래프가 보관하는 활성화 메모리 (Config.release_unsaved 비교)
+
+def step(model, x, t):
+    tracemalloc.start()
+    start = time.perf_counter()
+    y = model(x)
+    loss = F.softmax_cross_entropy(y, t)
+    retained = utils.retained_bytes(loss)
+    model.cleargrads()
+    loss.backward()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return retained, peak, elapsed
+
+def bench(activation, depth=20, width=1000, batch_size=256):
+    np.random.seed(0)
+    model = MLP((width,) * depth + (10,), activation=activation)
+    x = np.random.randn(batch_size, 100).astype(np.float32)
+    t = np.random.randint(0, 10, batch_size)
+    step(model, x, t) # 가중치 초기화
+
+    for release in (False, True):
+        with dezero.using_config('release_unsaved', release):
+            retained, peak, elapsed = step(model, x, t)
+        print('{:8s} depth={} release_unsaved={!s:5s}  retained activations: '
+              '{:7.1f} MB  peak: {:7.1f} MB  step: {:6.1f} ms'.format(
+            activation.__name__, depth, release, retained / 2**20,
+            peak / 2**20, elapsed * 1e3))
+
+if __name__ == '__main__':
+    # pool이 재사용하는 버퍼는 tracemalloc에 새 할당으로 잡히지 않으므로 끄고 측정
+    pool.default_pool.enabled = False
+    bench(F.sigmoid)
+    bench(F.tanh)
+    bench(F.relu)
@@ -0,0 +1,64 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import os
+import time
+import tempfile
+import numpy as np
+from dezero import optimizers
+from dezero.models import MLP
+from dezero.dataloaders import DataLoader
+from dezero.snapshot import Snapshot
+import dezero.datasets
+import dezero.functions as F
+
+# 스냅샷 비용: 매번 np.savez로 전부 다시 쓰기 vs Snapshot.save (두 번째부터 memmap에 제자리 복사)
+
+def savez_all(path, model, optimizer, loader):
+    arrays = {}
+    params_dict = {}
+    model._flatten_params(params_dict)
+    for key, param in params_dict.items():
+        arrays['model/' + key] = param.data
+    for key, value in optimizer.state_dict().items():
+        arrays['optimizer/' + key] = value
+    arrays['loader/index'] = loader.index
+    np.savez(path, **arrays)
+
+def bench(hidden_sizes, iters=5):
+    np.random.seed(0)
+    model = MLP(hidden_sizes)
+    optimizer = optimizers.MomentumSGD().setup(model)
+    loader = DataLoader(dezero.datasets.Spiral(), 30)
+    x = np.random.randn(30, 784).astype(np.float32)
+    t = np.random.randint(0, hidden_sizes[-1], 30)
+    loss = F.softmax_cross_entropy(model(x), t)
+    loss.backward()
+    optimizer.update()
+    nbytes = sum(p.data.nbytes for p in model.params()) * 2
+
+    with tempfile.TemporaryDirectory() as d:
+        start = time.perf_counter()
+        for i in range(iters):
+            savez_all(os.path.join(d, 'snap.npz'), model, optimizer, loader)
+        t_savez = (time.perf_counter() - start) / iters
+
+        for sync in (True, False):
+            snapshot = Snapshot(os.path.join(d, 'snap{}'.format(sync)), model,
+                                optimizer, loader, sync=sync)
+            start = time.perf_counter()
+            snapshot.save(epoch=0)
+            t_first = time.perf_counter() - start
+            start = time.perf_counter()
+            for i in range(iters):
+                snapshot.save(epoch=0)
+            t_next = (time.perf_counter() - start) / iters
+            print('MLP{} ({:.0f} MB)  np.savez: {:7.1f} ms  Snapshot(sync={!s:5s}) '
+                  'first: {:7.1f} ms  next: {:7.1f} ms'.format(
+                hidden_sizes, nbytes / 2**20, t_savez * 1e3, sync,
+                t_first * 1e3, t_next * 1e3))
+
+if __name__ == '__main__':
+    bench((1000, 10))
+    bench((2048, 2048, 10))
@@ -0,0 +1,51 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import numpy as np
+from dezero import optimizers
+from dezero.models import MLP
+from dezero.static import StaticGraph
+import dezero.functions as F
+
+# 같은 모양의 미니배치로 반복 학습할 때 eager 실행과 StaticGraph 재생 비교
+
+def train(model, step, x, t, iters):
+    optimizer = optimizers.SGD(0.1).setup(model)
+    start = time.perf_counter()
+    for i in range(iters):
+        y, loss = step(model, x, t)
+        optimizer.update()
+    return iters / (time.perf_counter() - start), loss
+
+def eager_step(model, x, t):
+    y = model(x)
+    loss = F.softmax_cross_entropy(y, t)
+    model.cleargrads()
+    loss.backward()
+    return y, loss
+
+def bench(hidden_sizes, batch_size, in_size=2, iters=2000):
+    x = np.random.randn(batch_size, in_size)
+    t = np.random.randint(0, hidden_sizes[-1], batch_size)
+
+    np.random.seed(0)
+    model = MLP(hidden_sizes)
+    eager_ips, eager_loss = train(model, eager_step, x, t, iters)
+
+    np.random.seed(0)
+    model = MLP(hidden_sizes)
+    static = StaticGraph(model, F.softmax_cross_entropy)
+    static_ips, static_loss = train(model, lambda m, x, t: static(x, t), x, t, iters)
+
+    print('MLP{} batch={:4d}  eager: {:8,.0f} it/s  static: {:8,.0f} it/s  '
+          'x{:.2f}  |loss diff|={:.1e}'.format(
+        hidden_sizes, batch_size, eager_ips, static_ips, static_ips / eager_ips,
+        abs(float(eager_loss.data) - float(static_loss.data))))
+
+if __name__ == '__main__':
+    bench((10, 3), 30)
+    bench((10, 10, 10, 3), 30)
+    bench((100, 10), 100, in_size=784, iters=500)
+    bench((1000, 10), 100, in_size=784, iters=100)
@@ -0,0 +1,89 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import asyncio
+import threading
+import numpy as np
+import dezero
+from dezero import Variable, Config
+from dezero.models import MLP
+import dezero.functions as F
+
+# 1) 스트레스 검사: grad / no_grad 작업을 섞은 스레드(및 asyncio 태스크)가 서로의 모드를 바꾸지 않는지
+# 2) no_grad 추론 처리량: 스레드 수별 (NumPy 연산은 GIL을 놓는다)
+
+def stress(n_threads=16, iters=300):
+    errors = []
+    barrier = threading.Barrier(n_threads)
+
+    def worker(i):
+        barrier.wait()
+        x = Variable(np.random.randn(8, 8))
+        for _ in range(iters):
+            if i % 2:
+                with dezero.no_grad():
+                    y = F.sum(F.tanh(x) * 2)
+                    if Config.enable_backdrop or y.creator is not None:
+                        errors.append('no_grad leaked a graph in thread {}'.format(i))
+            else:
+                y = F.sum(F.tanh(x) * 2)
+                x.cleargrad()
+                y.backward()
+                if not Config.enable_backdrop or x.grad is None:
+                    errors.append('gradient lost in thread {}'.format(i))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    async def task(i):
+        for _ in range(50):
+            if i % 2:
+                with dezero.no_grad():
+                    await asyncio.sleep(0)
+                    if Config.enable_backdrop:
+                        errors.append('no_grad leaked into task {}'.format(i))
+            else:
+                await asyncio.sleep(0)
+                if not Config.enable_backdrop:
+                    errors.append('task {} lost gradients'.format(i))
+
+    async def main():
+        await asyncio.gather(*[task(i) for i in range(16)])
+    asyncio.run(main())
+
+    assert not errors, errors[:5]
+    print('stress: {} threads x {} iters + 16 asyncio tasks: ok'.format(n_threads, iters))
+
+def throughput(n_threads, model, x, requests=256):
+    per_thread = requests // n_threads
+
+    def worker():
+        with dezero.no_grad():
+            for _ in range(per_thread):
+                model(x)
+
+    threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return per_thread * n_threads / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    stress()
+    np.random.seed(0)
+    model = MLP((1000, 1000, 10))
+    x = np.random.randn(64, 784).astype(np.float32)
+    model(x)
+    base = None
+    for n_threads in (1, 2, 4, 8):
+        rps = throughput(n_threads, model, x)
+        base = base or rps
+        print('no_grad inference threads={}  {:7.1f} req/s  ({:4.2f}x)'.format(
+            n_threads, rps, rps / base))
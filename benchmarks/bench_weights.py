@@ -0,0 +1,62 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import os
+import time
+import tempfile
+import numpy as np
+from dezero.models import MLP
+
+# 가중치 저장 / 불러오기 시간: np.savez(복사해서 읽기)와 save_weights / load_weights(memmap) 비교
+
+def build(hidden_sizes, in_size=784):
+    np.random.seed(0)
+    model = MLP(hidden_sizes)
+    model(np.zeros((1, in_size), dtype=np.float32))
+    return model
+
+def savez(model, path):
+    params_dict = {}
+    model._flatten_params(params_dict)
+    np.savez(path, **{key: p.data for key, p in params_dict.items()})
+
+def loadz(model, path):
+    params_dict = {}
+    model._flatten_params(params_dict)
+    npz = np.load(path)
+    for key, param in params_dict.items():
+        param.data = npz[key]
+
+def timeit(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def bench(hidden_sizes):
+    model = build(hidden_sizes)
+    x = np.random.randn(8, 784).astype(np.float32)
+    expected = model(x).data
+    nbytes = sum(p.data.nbytes for p in model.params())
+
+    with tempfile.TemporaryDirectory() as d:
+        npz_path, bin_path = os.path.join(d, 'w.npz'), os.path.join(d, 'w.bin')
+        t_savez = timeit(lambda: savez(model, npz_path))
+        t_save = timeit(lambda: model.save_weights(bin_path))
+
+        loaded = MLP(hidden_sizes)
+        t_loadz = timeit(lambda: loadz(loaded, npz_path))
+        mapped = MLP(hidden_sizes)
+        t_load = timeit(lambda: mapped.load_weights(bin_path))
+        assert np.allclose(mapped(x).data, expected)
+        assert np.allclose(loaded(x).data, expected)
+        del mapped
+
+    print('MLP{} ({:.0f} MB)  savez: {:7.1f} ms  save_weights: {:7.1f} ms  '
+          'np.load: {:7.1f} ms  load_weights: {:6.2f} ms'.format(
+        hidden_sizes, nbytes / 2**20, t_savez * 1e3, t_save * 1e3,
+        t_loadz * 1e3, t_load * 1e3))
+
+if __name__ == '__main__':
+    bench((1000, 10))
+    bench((4096, 4096, 4096, 10))
@@ -19,6 +19,8 @@ else:
     from dezero.core import as_variable
     from dezero.core import setup_variable
     from dezero.core import Config
+    from dezero.core import jvp
+    from dezero.core import hvp
     from dezero.layers import Layer
     from dezero.models import Model
     
@@ -31,5 +33,12 @@ else:
     import dezero.utils
     # import dezero.cuda
     import dezero.transforms
+    import dezero.static
+    import dezero.pool
+    import dezero.per_example
+    import dezero.profiler
+    import dezero.memory
+    import dezero.distributed
+    import dezero.snapshot
 
 setup_variable()
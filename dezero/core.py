@@ -1,25 +1,74 @@
+import sys
+import time
+import heapq
+import warnings
+import itertools
 import numpy as np
 import contextlib 
+import contextvars
+import threading
+import concurrent.futures
 import weakref 
 import dezero
+from dezero import pool
 
 class Config:
+    """Global settings.
+    Assigning an attribute (`Config.dtype = np.float64`) changes the process
+    wide default. `using_config` / `no_grad` only override a setting for the
+    current thread or asyncio task, so a thread serving under no_grad does
+    not switch off gradients for a thread that is training.
+    """
     enable_backdrop = True
+    release_unsaved = True # backward에 필요 없는 중간 결과의 data를 forward 직후 해제
+    profiler = None # dezero.profiler.Profiler (profile() 컨텍스트에서 설정)
+    backward_threads = 0 # 0보다 크면 backward에서 독립된 함수들을 이 수의 스레드로 동시에 실행
+    forward_ad = False # True면 Variable.tangent를 함수마다 jvp로 전파 (forward-mode 미분)
+    # dtype 정책
+    dtype = np.float32 # 매개변수 / 데이터셋 / 연산의 기본 부동소수점형
+    storage_dtype = None # np.float16이면 활성화는 float16으로 보관하고 계산은 dtype으로
+    debug_dtype = False # True면 출력 dtype이 어떤 입력보다 커진(승격된) 함수를 보고
+
+# using_config로 바꾼 값 {이름: 값} (스레드 / asyncio 태스크마다 따로 보관)
+_config_overrides = contextvars.ContextVar('dezero_config_overrides', default=None)
+
+def _config_property(name, default):
+    defaults = {name: default}
+
+    def fget(self):
+        overrides = _config_overrides.get()
+        if overrides is not None and name in overrides:
+            return overrides[name]
+        return defaults[name]
+
+    def fset(self, value):
+        defaults[name] = value
+    return property(fget, fset)
+
+for _name, _value in list(vars(Config).items()):
+    if not _name.startswith('_'):
+        setattr(Config, _name, _config_property(_name, _value))
+Config = Config() # 속성 접근이 property를 거치도록 인스턴스로 바꾼다
     
 @contextlib.contextmanager
 def using_config(name, value): 
-    old_value = getattr(Config, name) 
-    setattr(Config, name, value) 
+    getattr(Config, name) # 없는 설정이면 AttributeError
+    overrides = _config_overrides.get() or {}
+    token = _config_overrides.set({**overrides, name: value})
     try:
         yield
     
     finally:
-        setattr(Config, name, old_value)
+        _config_overrides.reset(token)
 
 def no_grad():
     return using_config('enable_backdrop', False)
 
 class Variable:
+    # 노드 수가 많은 그래프에서 인스턴스 __dict__ 비용을 줄이기 위해 __slots__ 사용
+    # (outputs가 약한 참조로 가리키므로 __weakref__ 필요)
+    __slots__ = ('data', 'name', 'grad', 'creator', 'generation',
+                 'unsaved_users', 'tangent', '__weakref__')
     __array_priority__ = 200 
 
     def __init__(self, data, name=None): 
@@ -32,50 +81,75 @@ class Variable:
         self.grad = None
         self.creator = None
         self.generation = 0 
+        self.unsaved_users = [] # data를 보관하지 않고 이 변수를 입력받은 함수들 (약한 참조)
+        self.tangent = None # forward-mode 미분의 방향 도함수 (ndarray, None이면 0)
 
     def set_creator(self, func):
         self.creator = func
         self.generation = func.generation + 1
 
     def backward(self, retain_grad = False, create_graph = False):
+        if _released.vars:
+            release_unsaved()
         if self.grad is None:
             # self.grad = np.ones_like(self.data) 
-            self.grad = Variable(np.ones_like(self.data))
+            self.grad = Variable(pool.ones(self.shape, self.dtype))
             
+        # generation이 큰 함수부터 꺼내는 우선순위 큐
+        # 같은 generation이면 나중에 추가된 함수가 먼저 (기존 sort + pop 순서와 동일)
         funcs = []
         seen_set = set()
+        counter = itertools.count()
 
         def add_func(f):
             if f not in seen_set:
-                funcs.append(f)
+                heapq.heappush(funcs, (-f.generation, -next(counter), f))
                 seen_set.add(f)
-                funcs.sort(key=lambda x: x.generation) 
   
-        add_func(self.creator)
-
-        while funcs:
-            f = funcs.pop()
-            gys = [output().grad for output in f.outputs] 
-            
-            ### 추가
-            with using_config('enable_backdrop', create_graph):
-                gxs = f.backward(*gys) # 메인 backward
-                if not isinstance(gxs, tuple):
-                    gxs = (gxs,)
-
-                for x, gx in zip(f.inputs, gxs):
-                    if x.grad is None:
-                        x.grad = gx
-                    else:
-                        x.grad = x.grad + gx
-
+        # create_graph=False일 때 fan-in 기울기를 누적할 전용 버퍼 {Variable: grad Variable}
+        # 버퍼는 이 backward가 새로 만든 배열이므로 다른 변수와 공유되지 않아 in-place 덧셈이 안전하다
+        buffers = {}
+
+        def accumulate(x, gx):
+            buf = buffers.get(x)
+            if buf is not None and buf is x.grad and buf.shape == gx.shape \
+                    and np.result_type(buf.data, gx.data) == buf.dtype:
+                np.add(buf.data, gx.data, out=buf.data)
+                return
+            x.grad = Variable(as_array(x.grad.data + gx.data))
+            buffers[x] = x.grad
+
+        def update(f, gxs):
+            for x, gx in zip(f.inputs, gxs):
+                if x.grad is None:
+                    x.grad = gx
+                elif create_graph or Config.forward_ad:
+                    # 고차 미분용 그래프 / tangent 전파를 위해 Add 함수로 더한다
+                    x.grad = x.grad + gx
+                else:
+                    accumulate(x, gx)
+
+            if not retain_grad:
+                for y in f.outputs:
+                    y().grad = None 
+                    buffers.pop(y(), None)
+
+        ### 추가
+        with using_config('enable_backdrop', create_graph):
+            if Config.backward_threads:
+                _parallel_backward(self.creator, update)
+                return
+
+            add_func(self.creator)
+            while funcs:
+                f = heapq.heappop(funcs)[2]
+                gys = [output().grad for output in f.outputs] 
+                gxs = _call_backward(f, gys) # 메인 backward
+                update(f, gxs)
+                for x in f.inputs:
                     if x.creator is not None:
                         add_func(x.creator)
 
-                if not retain_grad:
-                    for y in f.outputs:
-                        y().grad = None 
-
     def cleargrad(self):
         self.grad = None
         
@@ -120,18 +194,188 @@ class Variable:
         return 'variable(' + p + ')'
 
 class Parameter(Variable):
-    pass
+    __slots__ = ()
+
+def _call_backward(f, gys):
+    prof = Config.profiler
+    if prof is None:
+        gxs = f.backward(*gys)
+    else:
+        start = time.perf_counter_ns()
+        prof.backward_depth += 1
+        try:
+            gxs = f.backward(*gys)
+        finally:
+            prof.backward_depth -= 1
+    if not isinstance(gxs, tuple):
+        gxs = (gxs,)
+    if prof is not None:
+        prof.record(f, 'backward', start,
+                    [None if gy is None else gy.data for gy in gys],
+                    [None if gx is None else gx.data for gx in gxs])
+    return gxs
+
+# =============================================================================
+# 병렬 backward (Config.backward_threads > 0)
+# =============================================================================
+_executor = None
+_executor_lock = threading.Lock()
+
+def _backward_executor():
+    global _executor
+    n = Config.backward_threads
+    with _executor_lock:
+        if _executor is None or _executor._max_workers != n:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                n, thread_name_prefix='dezero-backward')
+        return _executor
+
+def _run_serial(fn, *args):
+    # 작업 스레드 안에서는 다시 작업을 나누지 않는다 (풀 스레드끼리 기다리는 교착 방지)
+    with using_config('backward_threads', 0):
+        return fn(*args)
+
+def fork(fn, *args):
+    """Start `fn(*args)` on the backward thread pool.
+    Used inside Function.backward for independent pieces of work (e.g. the
+    gx / gW products of MatMul). Without Config.backward_threads, or when
+    already on a pool thread, `fn` runs immediately.
+    Returns:
+        concurrent.futures.Future: Call `.result()` for the value.
+    """
+    if not Config.backward_threads:
+        future = concurrent.futures.Future()
+        future.set_result(fn(*args))
+        return future
+    # 설정(no_grad 등)을 작업 스레드에 넘기기 위해 컨텍스트를 복사해서 실행
+    return _backward_executor().submit(contextvars.copy_context().run,
+                                       _run_serial, fn, *args)
+
+def _parallel_backward(root, update):
+    """Run the backward of every ready Function concurrently.
+    A Function is ready once all Functions that consume its outputs have run
+    (dependency counts). Ready Functions form a wave; after the wave, their
+    gradients are accumulated on the calling thread in a fixed order, so the
+    result does not depend on thread timing.
+    """
+    pending = {} # 함수 -> 아직 실행되지 않은 소비 함수(입력 edge) 수
+    stack, seen_set = [root], {root}
+    while stack:
+        f = stack.pop()
+        for x in f.inputs:
+            c = x.creator
+            if c is not None:
+                pending[c] = pending.get(c, 0) + 1
+                if c not in seen_set:
+                    seen_set.add(c)
+                    stack.append(c)
+
+    ready = [root]
+    while ready:
+        ready.sort(key=lambda f: -f.generation) # 같은 generation은 발견 순서 유지
+        gys_list = [[output().grad for output in f.outputs] for f in ready]
+        if len(ready) == 1:
+            results = [_call_backward(ready[0], gys_list[0])]
+        else:
+            futures = [fork(_call_backward, f, gys) for f, gys in zip(ready, gys_list)]
+            results = [future.result() for future in futures]
+
+        next_ready = []
+        for f, gxs in zip(ready, results):
+            update(f, gxs)
+            for x in f.inputs:
+                c = x.creator
+                if c is not None:
+                    pending[c] -= 1
+                    if pending[c] == 0:
+                        next_ready.append(c)
+        ready = next_ready
+
+# 최근 data를 보관하지 않는 함수에 입력된 중간 변수들 (다음 함수 호출 때 해제 여부 확인)
+# 스레드마다 따로 둔다 (여러 스레드가 같은 set을 비우면 pop이 경쟁한다)
+class _ReleasedVariables(threading.local):
+    def __init__(self):
+        self.vars = set()
+
+_released = _ReleasedVariables()
+
+def release_unsaved():
+    """Free the data of recently consumed intermediate Variables that no
+    backward needs and that nothing outside the graph references any more
+    (for the calling thread).
+    """
+    released = _released.vars
+    while released:
+        x = released.pop()
+        # 버려진 함수는 더 이상 x를 참조하지 않으므로 살아 있는 함수만 센다
+        x.unsaved_users = [r for r in x.unsaved_users if r() is not None]
+        # 참조: 살아 있는 보관하지 않는 함수들의 inputs + 지역 변수 x + getrefcount 인자
+        if x.unsaved_users and sys.getrefcount(x) == len(x.unsaved_users) + 2:
+            x.data = None
+
+# Config.debug_dtype일 때 기록되는 (함수 이름, 입력 dtype들, 출력 dtype)
+dtype_promotions = []
+
+def _forward_with_dtype_policy(f, xs):
+    storage, compute = Config.storage_dtype, np.dtype(Config.dtype)
+    if storage is not None: # 보관용 dtype -> 계산용 dtype
+        xs = [x.astype(compute) if x is not None and x.dtype == storage else x
+              for x in xs]
+    ys = f.forward(*xs)
+    if not isinstance(ys, tuple):
+        ys = (ys, )
+
+    if Config.debug_dtype:
+        in_sizes = [x.dtype.itemsize for x in xs
+                    if x is not None and x.dtype.kind == 'f']
+        for y in ys:
+            y = np.asarray(y)
+            if in_sizes and y.dtype.kind == 'f' and \
+                    y.dtype.itemsize > min(in_sizes):
+                record = (f.__class__.__name__,
+                          tuple(str(x.dtype) for x in xs if x is not None),
+                          str(y.dtype))
+                dtype_promotions.append(record)
+                warnings.warn('{} promoted {} to {}'.format(*record),
+                              RuntimeWarning, stacklevel=3)
+
+    if storage is not None: # 계산 결과는 다시 보관용 dtype으로
+        ys = tuple(y.astype(storage) if np.asarray(y).dtype.kind == 'f' else y
+                   for y in ys)
+    return ys
 
 class Function:
+    # 하위 클래스도 forward에서 저장하는 속성을 __slots__로 선언한다
+    __slots__ = ('inputs', 'outputs', 'generation', '__weakref__')
+
+    # backward가 data를 읽는 입력 번호 (None이면 모든 입력)와 출력 사용 여부
+    # 선언되지 않은 중간 변수의 data는 다른 곳에서 참조하지 않으면 해제된다
+    saved_inputs = None
+    saved_output = True
+
     def __call__(self, *inputs):
+        if _released.vars:
+            release_unsaved()
         inputs = [as_variable(x) for x in inputs] # Variable 인스턴스로 모두 만들어줌
 
         xs = [x.data for x in inputs] 
-        ys = self.forward(*xs)
+        prof = Config.profiler
+        if prof is not None:
+            start = time.perf_counter_ns()
+        if Config.storage_dtype is None and not Config.debug_dtype:
+            ys = self.forward(*xs)
+        else:
+            ys = _forward_with_dtype_policy(self, xs)
         if not isinstance(ys, tuple): 
             ys = (ys, ) 
+        if prof is not None:
+            prof.record(self, 'forward', start, xs, ys)
             
         outputs = [Variable(as_array(y)) for y in ys]
+        if Config.forward_ad:
+            _propagate_tangents(self, inputs, xs, outputs)
         
         if Config.enable_backdrop:
             self.generation = max([x.generation for x in inputs]) 
@@ -141,6 +385,13 @@ class Function:
             
             self.inputs = inputs 
             self.outputs = [weakref.ref(output) for output in outputs] 
+
+            if Config.release_unsaved and self.saved_inputs is not None:
+                for i, x in enumerate(inputs):
+                    if i not in self.saved_inputs and x.creator is not None \
+                            and not x.creator.saved_output:
+                        x.unsaved_users.append(weakref.ref(self))
+                        _released.vars.add(x)
         return outputs if len(outputs) > 1 else outputs[0]
 
     def forward(self, in_data): 
@@ -149,10 +400,33 @@ class Function:
     def backward(self, gy):
         raise NotImplementedError()
 
+    def jvp(self, xs, ys, ts):
+        # xs: 입력 ndarray, ys: forward 결과, ts: 입력 tangent (0이면 zeros)
+        # -> 출력 tangent (forward와 같은 형태로 반환)
+        raise NotImplementedError(
+            '{} has no jvp rule'.format(self.__class__.__name__))
+
+def _propagate_tangents(f, inputs, xs, outputs):
+    ts = [x.tangent for x in inputs]
+    if all(t is None for t in ts):
+        return
+    ts = [np.zeros_like(x) if t is None and x is not None else t
+          for x, t in zip(xs, ts)]
+    ys = [y.data for y in outputs]
+    tys = f.jvp(xs, ys if len(ys) > 1 else ys[0], ts)
+    if not isinstance(tys, tuple):
+        tys = (tys, )
+    for y, ty in zip(outputs, tys):
+        y.tangent = as_array(ty)
+
 class Add(Function):
+    __slots__ = ('x0_shape', 'x1_shape')
+    saved_inputs = ()
+    saved_output = False
+
     def forward(self, x0, x1):
         self.x0_shape, self.x1_shape = x0.shape, x1.shape
-        y = x0 + x1
+        y = pool.apply(np.add, x0, x1)
         return y
 
     def backward(self, gy):
@@ -162,10 +436,17 @@ class Add(Function):
             gx1 = dezero.functions.sum_to(gx1, self.x1_shape)
         return gx0, gx1
 
+    def jvp(self, xs, y, ts):
+        return ts[0] + ts[1]
+
 class Mul(Function):
+    __slots__ = ('x0_shape', 'x1_shape')
+    saved_inputs = (0, 1)
+    saved_output = False
+
     def forward(self, x0, x1):
         self.x0_shape, self.x1_shape = x0.shape, x1.shape
-        y = x0 * x1
+        y = pool.apply(np.multiply, x0, x1)
         return y
 
     def backward(self, gy):
@@ -178,17 +459,32 @@ class Mul(Function):
             gx1 = dezero.functions.sum_to(gx1, self.x1_shape)
         return gx0, gx1
 
+    def jvp(self, xs, y, ts):
+        (x0, x1), (t0, t1) = xs, ts
+        return t0 * x1 + x0 * t1
+
 class Neg(Function):
+    __slots__ = ()
+    saved_inputs = ()
+    saved_output = False
+
     def forward(self, x):
-        return -x
+        return pool.apply(np.negative, x)
     
     def backward(self, gy):
         return -gy
 
+    def jvp(self, xs, y, ts):
+        return -ts[0]
+
 class Sub(Function):
+    __slots__ = ('x0_shape', 'x1_shape')
+    saved_inputs = ()
+    saved_output = False
+
     def forward(self, x0, x1):
         self.x0_shape, self.x1_shape = x0.shape, x1.shape
-        y = x0 - x1
+        y = pool.apply(np.subtract, x0, x1)
         return y
 
     def backward(self, gy):
@@ -197,12 +493,19 @@ class Sub(Function):
         if self.x0_shape != self.x1_shape: # for broadcaset
             gx0 = dezero.functions.sum_to(gx0, self.x0_shape)
             gx1 = dezero.functions.sum_to(gx1, self.x1_shape)
-        return gx0, -gx1
+        return gx0, gx1
+
+    def jvp(self, xs, y, ts):
+        return ts[0] - ts[1]
 
 class Div(Function):
+    __slots__ = ('x0_shape', 'x1_shape')
+    saved_inputs = (0, 1)
+    saved_output = False
+
     def forward(self, x0, x1):
         self.x0_shape, self.x1_shape = x0.shape, x1.shape
-        y = x0 / x1
+        y = pool.apply(np.divide, x0, x1)
         return y
 
     def backward(self, gy):
@@ -214,7 +517,14 @@ class Div(Function):
             gx1 = dezero.functions.sum_to(gx1, self.x1_shape)
         return gx0, gx1
 
+    def jvp(self, xs, y, ts):
+        return (ts[0] - y * ts[1]) / xs[1]
+
 class Pow(Function):
+    __slots__ = ('c',)
+    saved_inputs = (0,)
+    saved_output = False
+
     def __init__(self, c):
         self.c = c
 
@@ -228,8 +538,16 @@ class Pow(Function):
         gx = c * x ** (c-1) * gy
         return gx
 
-def as_array(x):
+    def jvp(self, xs, y, ts):
+        c = self.c
+        return c * xs[0] ** (c-1) * ts[0]
+
+def as_array(x, dtype=None):
     if np.isscalar(x):
+        # 파이썬 스칼라가 연산 상대(dtype)의 부동소수점형을 따라가도록 해서 float64로 승격되지 않게 한다
+        if dtype is not None and np.dtype(dtype).kind == 'f' \
+                and isinstance(x, (int, float)):
+            return np.array(x, dtype=dtype)
         return np.array(x)
     return x
 
@@ -238,32 +556,86 @@ def as_variable(obj):
         return obj
     return Variable(obj)
 
+def _dual_inputs(xs, vs):
+    # 새 Variable에 tangent를 붙여서 원래 변수의 tangent / grad는 건드리지 않는다
+    single = not isinstance(xs, (list, tuple))
+    if single:
+        xs, vs = (xs,), (vs,)
+    duals = []
+    for x, v in zip(xs, vs):
+        x = Variable(as_array(x.data if isinstance(x, Variable) else x))
+        x.tangent = as_array(v)
+        duals.append(x)
+    return duals, single
+
+def jvp(f, xs, vs):
+    """Jacobian-vector product of `f` at `xs` along `vs` by forward mode.
+    Tangents are carried next to the values through one forward pass, so no
+    graph is built.
+    Args:
+        f (callable): Function of Variables.
+        xs (Variable or ndarray, or a list of them): Point.
+        vs (ndarray or list): Direction, same structure as `xs`.
+    Returns:
+        tuple: (y, tangent of y) as (Variable, ndarray).
+    """
+    duals, _ = _dual_inputs(xs, vs)
+    with using_config('forward_ad', True), no_grad():
+        y = f(*duals)
+    return y, y.tangent
+
+def hvp(f, xs, vs):
+    """Hessian-vector product of a scalar `f` by forward-over-reverse.
+    One forward pass with tangents and one backward pass; the tangents of
+    the gradients are H @ vs.
+    Args:
+        f (callable): Function of Variables returning a scalar Variable.
+        xs (Variable or ndarray, or a list of them): Point.
+        vs (ndarray or list): Direction, same structure as `xs`.
+    Returns:
+        tuple: (y, gradients, Hessian-vector products). Gradients are
+        Variables and products are ndarrays, given per input (or as single
+        values when `xs` is not a list).
+    """
+    duals, single = _dual_inputs(xs, vs)
+    with using_config('forward_ad', True):
+        y = f(*duals)
+        y.backward()
+    gxs, hvs = [], []
+    for x in duals:
+        gx = x.grad if x.grad is not None else Variable(np.zeros_like(x.data))
+        gxs.append(gx)
+        hvs.append(gx.tangent if gx.tangent is not None else np.zeros_like(x.data))
+    if single:
+        return y, gxs[0], hvs[0]
+    return y, gxs, hvs
+
 
 def add(x0, x1):
-    x1 = as_array(x1)
+    x1 = as_array(x1, x0.dtype)
     return Add()(x0, x1)
 
 def mul(x0, x1):
-    x1 = as_array(x1)
+    x1 = as_array(x1, x0.dtype)
     return Mul()(x0, x1)
 
 def neg(x):
     return Neg()(x)
 
 def sub(x0, x1):
-    x1 = as_array(x1)
+    x1 = as_array(x1, x0.dtype)
     return Sub()(x0, x1)
 
 def rsub(x0, x1):
-    x1 = as_array(x1)
+    x1 = as_array(x1, x0.dtype)
     return Sub()(x1, x0) 
 
 def div(x0, x1):
-    x1 = as_array(x1)
+    x1 = as_array(x1, x0.dtype)
     return Div()(x0, x1)
 
 def rdiv(x0, x1):
-    x1 = as_array(x1)
+    x1 = as_array(x1, x0.dtype)
     return Div()(x1, x0)
 
 def pow(x, c):
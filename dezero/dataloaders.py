@@ -1,42 +1,263 @@
 import math
 import random
+import traceback
 import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor
+from dezero.datasets import Dataset
+
+def batch_indexable(dataset):
+    """Whether `dataset.get_batch` can replace per-example __getitem__ calls.
+    Dataset subclasses that override __getitem__ (and not get_batch) keep
+    the per-example path.
+    """
+    cls = type(dataset)
+    if not isinstance(dataset, Dataset):
+        return False
+    if cls.get_batch is not Dataset.get_batch:
+        return True
+    return cls.__getitem__ is Dataset.__getitem__ and \
+        isinstance(dataset.data, np.ndarray) and isinstance(dataset.label, np.ndarray)
 
 class DataLoader:
-    def __init__(self, dataset, batch_size, shuffle=True):
+    """Iterate over `dataset` in mini-batches of (x, t).
+    Datasets that support batch indexing (see `batch_indexable`) are read
+    with one `dataset.get_batch` call per batch; others are collated from
+    per-example `dataset[i]` calls.
+    With `num_workers > 0` batches are built ahead of consumption in
+    background workers. Batch k always goes to worker k % num_workers, so
+    each worker's RNG stream and the batches it produces are reproducible.
+    Args:
+        dataset (dezero.datasets.Dataset): Dataset to iterate over.
+        batch_size (int): Mini-batch size.
+        shuffle (bool): Shuffle the order every epoch.
+        num_workers (int): Background workers (0: build batches in the
+            calling thread).
+        prefetch (int): Batches in flight per worker.
+        multiprocess (bool): Use forked worker processes that return batches
+            through a shared-memory ring. False uses threads, which share
+            the global NumPy RNG (transforms drawing from it are then not
+            reproducible) and only help when the dataset releases the GIL.
+        seed (int): Process worker w seeds np.random / random with
+            `seed + w`. Defaults to a value derived from the np.random
+            state without advancing it.
+        timeout (float): Seconds to wait for a batch before giving up.
+    """
+    def __init__(self, dataset, batch_size, shuffle=True, num_workers=0,
+                 prefetch=2, multiprocess=True, seed=None, timeout=600):
         self.dataset = dataset
         self.batch_size = batch_size
         self.shuffle = shuffle
         self.data_size = len(dataset)
         self.max_iter = math.ceil(self.data_size / batch_size)
-        
+
+        self.num_workers = num_workers
+        self.prefetch = prefetch
+        self.multiprocess = multiprocess
+        self.timeout = timeout
+        if num_workers > 0 and seed is None:
+            # 전역 난수열을 소비하지 않고 현재 상태에서 유도 (동기 경로와 같은 섞기 순서 유지)
+            key = np.random.get_state()[1]
+            seed = int(np.random.SeedSequence(key.tolist()).generate_state(1)[0]) \
+                % (2**31 - num_workers)
+        self.seed = seed
+        self.batch_indexable = batch_indexable(dataset)
+        self.n_inflight = num_workers * prefetch
+        self.workers = None # 첫 __next__에서 시작
+        self.submitted = 0 # 작업을 보낸 배치 번호의 끝
+        self.ready = {} # 배치 번호 -> 결과 (process worker는 순서 없이 도착)
+
         self.reset()
-        
+
     def reset(self):
+        self._drain()
         self.iteration = 0 # 반복 횟수 초기화
+        self.submitted = 0
         if self.shuffle:
             self.index = np.random.permutation(len(self.dataset)) # 데이터 뒤섞기
             return None
-        
+
         self.index = np.arange(len(self.dataset))
         return None
-    
+
     def __iter__(self):
         return self
-        
+
     def __next__(self):
         if self.iteration >= self.max_iter:
             self.reset()
             raise StopIteration
-        
-        i, batch_size = self.iteration, self.batch_size
-        batch_index = self.index[i * batch_size: (i+1)*batch_size]
+
+        if self.num_workers > 0:
+            x, t = self._next_prefetched()
+        else:
+            x, t = self._make_batch(self._batch_index(self.iteration))
+
+        self.iteration += 1
+        return x, t
+
+    def next(self):
+        return self.__next__()
+
+    def _batch_index(self, i):
+        batch_size = self.batch_size
+        return self.index[i * batch_size: (i+1)*batch_size]
+
+    def _make_batch(self, batch_index, out=None):
+        # out: 미리 할당한 (x, t). 채울 수 있으면 그대로 반환한다
+        if self.batch_indexable:
+            return self.dataset.get_batch(batch_index, out)
         batch = [self.dataset[i] for i in batch_index]
         x = np.array([example[0] for example in batch])
         t = np.array([example[1] for example in batch])
-        
-        self.iteration += 1
         return x, t
-    
-    def next(self):
-        return self.__next__()
\ No newline at end of file
+
+    def state_dict(self):
+        # 에폭 중간에서 이어서 돌 수 있도록 섞인 순서와 위치를 저장
+        return {'index': self.index, 'iteration': self.iteration}
+
+    def load_state_dict(self, state):
+        self._drain()
+        self.index = np.array(state['index'])
+        self.iteration = int(state['iteration'])
+        self.submitted = self.iteration
+
+    # =========================================================================
+    # Prefetching
+    # =========================================================================
+    def _start(self):
+        if not self.multiprocess:
+            self.workers = ThreadPoolExecutor(self.num_workers)
+            return
+
+        # 예제 하나로 slot 크기를 정한다 (RNG 상태는 되돌려 동기 경로와 같은 난수열 유지)
+        np_state, py_state = np.random.get_state(), random.getstate()
+        x0, t0 = self._make_batch(self.index[:1])
+        np.random.set_state(np_state)
+        random.setstate(py_state)
+        self.example_meta = ((x0.shape[1:], x0.dtype.str), (t0.shape[1:], t0.dtype.str))
+        align = lambda n: (n + 63) // 64 * 64
+        self.x_bytes = align(x0.nbytes * self.batch_size)
+        self.t_bytes = align(t0.nbytes * self.batch_size)
+        slot_bytes = self.x_bytes + self.t_bytes
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=max(slot_bytes * self.n_inflight, 1))
+
+        ctx = mp.get_context('fork')
+        self.results = ctx.Queue()
+        self.tasks = [ctx.Queue() for _ in range(self.num_workers)]
+        self.workers = [ctx.Process(target=self._worker, args=(rank,), daemon=True)
+                        for rank in range(self.num_workers)]
+        for p in self.workers:
+            p.start()
+
+    def _slot_arrays(self, slot, meta):
+        # meta = ((x shape, x dtype), (t shape, t dtype)) -> shm 위의 view
+        offset = slot * (self.x_bytes + self.t_bytes)
+        (x_shape, x_dtype), (t_shape, t_dtype) = meta
+        x = np.ndarray(x_shape, dtype=x_dtype, buffer=self.shm.buf, offset=offset)
+        t = np.ndarray(t_shape, dtype=t_dtype, buffer=self.shm.buf,
+                       offset=offset + self.x_bytes)
+        return x, t
+
+    def _worker(self, rank):
+        np.random.seed(self.seed + rank)
+        random.seed(self.seed + rank)
+        tasks = self.tasks[rank]
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            k, slot, batch_index = task
+            try:
+                (x_shape, x_dtype), (t_shape, t_dtype) = self.example_meta
+                out = None
+                if not (np.dtype(x_dtype).hasobject or np.dtype(t_dtype).hasobject):
+                    n = len(batch_index)
+                    meta = (((n,) + x_shape, x_dtype), ((n,) + t_shape, t_dtype))
+                    out = self._slot_arrays(slot, meta)
+                x, t = self._make_batch(batch_index, out)
+                if out is not None and x is out[0] and t is out[1]: # slot에 바로 썼다
+                    del x, t, out
+                    self.results.put((k, 'shm', meta))
+                elif x.nbytes <= self.x_bytes and t.nbytes <= self.t_bytes and \
+                        not (x.dtype.hasobject or t.dtype.hasobject):
+                    meta = ((x.shape, x.dtype.str), (t.shape, t.dtype.str))
+                    x_view, t_view = self._slot_arrays(slot, meta)
+                    x_view[...] = x
+                    t_view[...] = t
+                    del x_view, t_view
+                    self.results.put((k, 'shm', meta))
+                else: # 예제 크기가 달라 slot에 들어가지 않으면 queue로 보낸다
+                    self.results.put((k, 'array', (x, t)))
+            except Exception:
+                self.results.put((k, 'error', traceback.format_exc()))
+
+    def _submit(self, k):
+        batch_index = self._batch_index(k)
+        if self.multiprocess:
+            self.tasks[k % self.num_workers].put((k, k % self.n_inflight, batch_index))
+        else:
+            self.ready[k] = self.workers.submit(self._make_batch, batch_index)
+
+    def _receive(self, k):
+        if not self.multiprocess:
+            return self.ready.pop(k).result(timeout=self.timeout)
+
+        while k not in self.ready:
+            try:
+                msg = self.results.get(timeout=self.timeout)
+            except Exception:
+                raise RuntimeError('loader workers did not return batch {} within {} s'
+                                   .format(k, self.timeout))
+            self.ready[msg[0]] = msg
+        _, kind, payload = self.ready.pop(k)
+        if kind == 'error':
+            raise RuntimeError('loader worker failed on batch {}:\n{}'.format(k, payload))
+        if kind == 'array':
+            return payload
+        x, t = self._slot_arrays(k % self.n_inflight, payload)
+        return x.copy(), t.copy() # slot은 다음 배치가 덮어쓴다
+
+    def _next_prefetched(self):
+        if self.workers is None:
+            self._start()
+        end = min(self.max_iter, self.iteration + self.n_inflight)
+        while self.submitted < end:
+            self._submit(self.submitted)
+            self.submitted += 1
+        return self._receive(self.iteration)
+
+    def _drain(self):
+        # 보낸 작업을 모두 받아 버린다 (slot을 다시 쓰기 전에 worker가 끝나야 한다)
+        if self.workers is not None:
+            for k in range(self.iteration, self.submitted):
+                try:
+                    self._receive(k)
+                except RuntimeError:
+                    pass
+        self.ready.clear()
+
+    def close(self):
+        """Stop the workers and release the shared-memory ring."""
+        if self.workers is None:
+            return
+        if self.multiprocess:
+            for tasks in self.tasks:
+                tasks.put(None)
+            for p in self.workers:
+                p.join(timeout=5)
+                if p.is_alive():
+                    p.terminate()
+            self.shm.close()
+            self.shm.unlink()
+        else:
+            self.workers.shutdown(wait=True, cancel_futures=True)
+        self.workers = None
+        self.submitted = self.iteration
+        self.ready.clear()
+
+    def __del__(self):
+        if getattr(self, 'workers', None) is not None:
+            self.close()
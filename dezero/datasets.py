@@ -3,7 +3,8 @@ import gzip
 import numpy as np
 import matplotlib.pyplot as plt
 from dezero.utils import get_file, cache_dir
-from dezero.transforms import Compose, Flatten, ToFloat, Normalize
+from dezero.core import Config
+from dezero.transforms import Compose, Flatten, ToFloat, Normalize, supports_batch
 
 class Dataset:
     def __init__(self, train=True, transform=None, target_transform=None):
@@ -11,16 +12,19 @@ class Dataset:
         self.transform = transform
         self.target_transform = target_transform
         if self.transform is None:
-            self.transform = lambda x: x
+            self.transform = Compose() # 항등 변환 (배치에도 적용 가능)
         if self.target_transform is None:
-            self.target_transform = lambda x: x
+            self.target_transform = Compose()
             
         self.data = None
         self.label = None
         self.prepare()
         
     def __getitem__(self, index):
-        assert np.isscalar(index) # index는 정수(스칼라)만 지원
+        if isinstance(index, slice):
+            index = np.arange(len(self))[index]
+        if not np.isscalar(index): # 정수 배열이면 배치 단위로
+            return self.get_batch(index)
         if self.label is None:
             # return self.data[index], None
             return self.transform(self.data[index]), None
@@ -28,20 +32,58 @@ class Dataset:
         return self.transform(self.data[index]), \
                 self.target_transform(self.label[index])
     
+    def get_batch(self, index, out=None):
+        """Examples `index` stacked along axis 0 with one fancy index.
+        Transforms that support batches (see transforms.supports_batch) run
+        once on the whole batch; other transforms run per example.
+        Args:
+            index (ndarray): 1-D integer indices.
+            out (tuple): Preallocated (x, t) arrays. They are filled when
+                the batch has their shape and dtype.
+        Returns:
+            tuple: (x, t) ndarrays, `out` itself when it was filled. t is
+            None without labels.
+        """
+        index = np.asarray(index)
+        if index.ndim != 1 or (index.size and index.dtype.kind not in 'iu'):
+            raise TypeError('batch index must be a 1-D integer array or a slice, '
+                            'got {} of dtype {}'.format(index.shape, index.dtype))
+        index = index.astype(np.intp, copy=False)
+        x_out, t_out = (None, None) if out is None else out
+        x = self._take(self.data, index, self.transform, x_out)
+        if self.label is None:
+            return x, None
+        return x, self._take(self.label, index, self.target_transform, t_out)
+
+    def _take(self, data, index, transform, out):
+        if isinstance(transform, Compose) and not transform.transforms and \
+                out is not None and out.shape == (len(index),) + data.shape[1:] \
+                and out.dtype == data.dtype:
+            return np.take(data, index, axis=0, out=out) # 변환이 없으면 바로 out으로
+        if supports_batch(transform):
+            x = transform.batch(data[index])
+        else:
+            x = np.array([transform(data[i]) for i in index])
+        if out is not None and out.shape == x.shape and out.dtype == x.dtype:
+            out[...] = x
+            return out
+        return x
+
     def __len__(self):
         return len(self.data)
     
     def prepare(self):
         pass
 
-def get_spiral(train=True):
+def get_spiral(train=True, dtype=None):
     seed = 1984 if train else 2020
     np.random.seed(seed=seed)
+    dtype = Config.dtype if dtype is None else dtype
     
     num_data, num_class, input_dim = 100, 3, 2
     data_size = num_class * num_data
-    x = np.zeros((data_size, input_dim))
-    t = np.zeros(data_size, dtype=np.int)
+    x = np.zeros((data_size, input_dim), dtype=dtype)
+    t = np.zeros(data_size, dtype=np.int64)
     
     for j in range(num_class):
         for i in range(num_data):
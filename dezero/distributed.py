@@ -0,0 +1,362 @@
+import time
+import queue
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import dezero
+import dezero.functions as F
+from dezero.dataloaders import DataLoader
+
+class Shard:
+    """View of `dataset` restricted to `indices` (one worker's part)."""
+    def __init__(self, dataset, indices):
+        self.dataset = dataset
+        self.indices = indices
+
+    def __getitem__(self, index):
+        return self.dataset[self.indices[index]]
+
+    def __len__(self):
+        return len(self.indices)
+
+class AllReduce:
+    """Average flat gradients of `n_workers` processes in shared memory.
+    Each worker writes its gradients into its own row of `grads`, then
+    reduces one column chunk over all rows into `sums` (reduce-scatter),
+    and finally every worker reads the whole `sums` row (all-gather). The
+    sum is computed once per element in a fixed order, so all workers get
+    bitwise identical results. `sums` alternates between two rows so a fast
+    worker never overwrites a result a slow worker is still reading.
+    Args:
+        size (int): Number of gradient elements per worker.
+        dtype: Gradient dtype.
+        n_workers (int): Number of processes.
+        ctx: multiprocessing context used for the barrier.
+    """
+    def __init__(self, size, dtype, n_workers, ctx):
+        self.size = size
+        self.dtype = np.dtype(dtype)
+        self.n_workers = n_workers
+        nbytes = (n_workers + 2) * size * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        self.barrier = ctx.Barrier(n_workers)
+        self.step = 0
+
+    def _views(self):
+        buf = np.ndarray((self.n_workers + 2, self.size), dtype=self.dtype,
+                         buffer=self.shm.buf)
+        return buf[:self.n_workers], buf[self.n_workers:]
+
+    def __call__(self, rank, grad, timeout=None):
+        """All-reduce (mean) the flat array `grad` in place."""
+        grads, sums = self._views()
+        out = sums[self.step % 2]
+        self.step += 1
+        grads[rank] = grad
+        self.barrier.wait(timeout)
+
+        chunk = -(-self.size // self.n_workers)
+        lo, hi = rank * chunk, min((rank + 1) * chunk, self.size)
+        if lo < hi:
+            np.sum(grads[:, lo:hi], axis=0, out=out[lo:hi])
+            out[lo:hi] /= self.n_workers
+        self.barrier.wait(timeout)
+        grad[...] = out
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+def _flatten_grads(params, flat):
+    i = 0
+    for param in params:
+        n = param.data.size
+        if param.grad is None:
+            flat[i:i + n] = 0
+        else:
+            flat[i:i + n] = param.grad.data.ravel()
+        i += n
+
+def _unflatten_grads(params, flat):
+    i = 0
+    for param in params:
+        n = param.data.size
+        param.grad = dezero.Variable(flat[i:i + n].reshape(param.data.shape))
+        i += n
+
+def _gather(results, procs, count, poll=1.0):
+    """Collect `count` reports from `results`. Raise RuntimeError (after
+    terminating the other workers) instead of waiting forever when a
+    worker dies, e.g. killed for running out of memory, or when every
+    worker has exited with reports still missing."""
+    reports = []
+    while len(reports) < count:
+        try:
+            reports.append(results.get(timeout=poll))
+            continue
+        except queue.Empty:
+            pass
+        dead = [p for p in procs if p.exitcode not in (None, 0)]
+        if dead or all(not p.is_alive() for p in procs):
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+            for p in procs:
+                p.join()
+            if dead:
+                raise RuntimeError('worker process {} died with exit code {}'.format(
+                    procs.index(dead[0]), dead[0].exitcode))
+            raise RuntimeError('workers exited with {} of {} reports missing'.format(
+                count - len(reports), count))
+    return reports
+
+class DataParallelTrainer:
+    """Synchronous data-parallel training on forked worker processes.
+    Every worker holds a copy of the model (inherited through fork), trains
+    on its own shard of the dataset with a batch of `batch_size // n_workers`,
+    averages gradients with the other workers through shared memory and then
+    calls `optimizer.update()`. All workers apply the same update, so their
+    parameters stay identical; rank 0 copies its final parameters back into
+    the parent's model.
+    Args:
+        model (dezero.Model): Model to train. Its parameters are initialized
+            in the parent before forking.
+        optimizer (dezero.optimizers.Optimizer): Optimizer set up on `model`.
+        n_workers (int): Number of processes.
+        loss_fn (callable): Loss function.
+        timeout (float): Seconds to wait at a barrier before giving up.
+    """
+    def __init__(self, model, optimizer, n_workers=2,
+                 loss_fn=F.softmax_cross_entropy, timeout=600):
+        self.model = model
+        self.optimizer = optimizer
+        self.n_workers = n_workers
+        self.loss_fn = loss_fn
+        self.timeout = timeout
+
+    def fit(self, dataset, batch_size, max_epoch=1, shuffle=True):
+        """Train and return per-epoch history dicts with 'epoch', 'loss',
+        'accuracy', 'time' and 'samples_per_sec'."""
+        ctx = mp.get_context('fork')
+        n = self.n_workers
+        per_worker = len(dataset) // n # 모든 worker가 같은 반복 횟수로 맞물려 돌도록 자른다
+        index = np.random.permutation(len(dataset)) if shuffle else np.arange(len(dataset))
+
+        x0 = np.array([dataset[i][0] for i in index[:1]])
+        with dezero.no_grad(): # 지연 초기화되는 매개변수를 fork 전에 만든다
+            self.model(x0)
+        params = list(self.model.params())
+        size = sum(p.data.size for p in params)
+        dtype = np.result_type(*[p.data for p in params])
+
+        allreduce = AllReduce(size, dtype, n, ctx)
+        final = shared_memory.SharedMemory(create=True, size=size * np.dtype(dtype).itemsize)
+        results = ctx.Queue()
+        try:
+            procs = [ctx.Process(target=self._worker,
+                                 args=(rank, Shard(dataset, index[rank * per_worker:(rank + 1) * per_worker]),
+                                       max(1, batch_size // n), max_epoch, shuffle,
+                                       allreduce, final, results))
+                     for rank in range(n)]
+            for p in procs:
+                p.start()
+            reports = _gather(results, procs, n * max_epoch + n)
+            for p in procs:
+                p.join()
+            errors = [r for r in reports if r[0] == 'error']
+            if errors:
+                raise RuntimeError('worker {} failed:\n{}'.format(*errors[0][1:]))
+
+            flat = np.ndarray((size,), dtype=dtype, buffer=final.buf)
+            i = 0
+            for param in params:
+                param.data[...] = flat[i:i + param.data.size].reshape(param.data.shape)
+                i += param.data.size
+            del flat
+        finally:
+            allreduce.close()
+            final.close()
+            final.unlink()
+
+        self.checksums = [r[2] for r in reports if r[0] == 'done']
+        history = []
+        for epoch in range(max_epoch):
+            rows = [r for r in reports if r[0] == 'epoch' and r[1] == epoch]
+            samples = sum(r[5] for r in rows)
+            elapsed = max(r[4] for r in rows)
+            history.append({'epoch': epoch + 1,
+                            'loss': sum(r[2] for r in rows) / samples,
+                            'accuracy': sum(r[3] for r in rows) / samples,
+                            'time': elapsed, 'samples_per_sec': samples / elapsed})
+        return history
+
+    def _worker(self, rank, shard, batch_size, max_epoch, shuffle,
+                allreduce, final, results):
+        try:
+            np.random.seed(rank) # shard 내부 섞기만 worker마다 다르게
+            model, optimizer = self.model, self.optimizer
+            params = list(model.params())
+            loader = DataLoader(shard, batch_size, shuffle=shuffle)
+            flat = np.empty(allreduce.size, dtype=allreduce.dtype)
+
+            for epoch in range(max_epoch):
+                sum_loss, sum_acc, count = 0.0, 0.0, 0
+                start = time.perf_counter()
+                for x, t in loader:
+                    y = model(x)
+                    loss = self.loss_fn(y, t)
+                    model.cleargrads()
+                    loss.backward()
+                    _flatten_grads(params, flat)
+                    allreduce(rank, flat, self.timeout)
+                    _unflatten_grads(params, flat)
+                    optimizer.update()
+
+                    sum_loss += float(loss.data) * len(t)
+                    sum_acc += float(F.accuracy(y, t).data) * len(t)
+                    count += len(t)
+                results.put(('epoch', epoch, sum_loss, sum_acc,
+                             time.perf_counter() - start, count))
+
+            i = 0
+            if rank == 0:
+                out = np.ndarray((allreduce.size,), dtype=allreduce.dtype, buffer=final.buf)
+                for param in params:
+                    out[i:i + param.data.size] = param.data.ravel()
+                    i += param.data.size
+                del out
+            checksum = float(sum(np.abs(p.data).sum(dtype=np.float64) for p in params))
+            results.put(('done', rank, checksum))
+        except Exception:
+            import traceback
+            allreduce.barrier.abort() # 다른 worker가 barrier에서 멈추지 않도록
+            results.put(('error', rank, traceback.format_exc()))
+            for _ in range(max_epoch): # fit이 기다리는 보고 수를 채운다
+                results.put(('error', rank, 'aborted'))
+
+# =============================================================================
+# Hogwild (lock-free asynchronous SGD)
+# =============================================================================
+def share_params(model):
+    """Move the parameters of `model` into one shared-memory block.
+    Every `param.data` becomes a view of the block, so processes forked
+    afterwards read and update the same arrays. Optimizers must update
+    `param.data` in place (SGD / MomentumSGD do) and must not use flat
+    buffers (`setup(..., flat=True)`), which keep their own copy.
+    Returns:
+        multiprocessing.shared_memory.SharedMemory: The block; pass it to
+        `unshare_params` when done.
+    """
+    params = list(model.params())
+    nbytes = sum(p.data.nbytes for p in params)
+    shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+    offset = 0
+    for param in params:
+        view = np.ndarray(param.data.shape, dtype=param.data.dtype,
+                          buffer=shm.buf, offset=offset)
+        view[...] = param.data
+        param.data = view
+        offset += param.data.nbytes
+    return shm
+
+def unshare_params(model, shm):
+    """Copy the parameters back into private arrays and free `shm`."""
+    for param in model.params():
+        param.data = param.data.copy()
+    shm.close()
+    shm.unlink()
+
+class HogwildTrainer:
+    """Asynchronous SGD on forked workers sharing one parameter block.
+    Workers train on their own shards and apply `optimizer.update()`
+    straight to the shared parameters without locks or barriers. Staleness
+    of an update is the number of updates other workers applied between
+    reading the parameters (start of forward) and writing them.
+    Args:
+        model (dezero.Model): Model to train; trained values end up in it.
+        optimizer (dezero.optimizers.Optimizer): Optimizer set up on `model`.
+        n_workers (int): Number of processes.
+        loss_fn (callable): Loss function.
+    """
+    def __init__(self, model, optimizer, n_workers=2,
+                 loss_fn=F.softmax_cross_entropy):
+        if getattr(optimizer, 'flat', None) is not None:
+            raise ValueError('HogwildTrainer needs an optimizer without flat buffers: '
+                             'updates to the private flat copy never reach the shared parameters')
+        self.model = model
+        self.optimizer = optimizer
+        self.n_workers = n_workers
+        self.loss_fn = loss_fn
+
+    def fit(self, dataset, batch_size, max_epoch=1, shuffle=True):
+        """Train and return a dict with the total 'samples_per_sec', 'loss'
+        and per-worker 'workers' statistics (samples, time, samples_per_sec,
+        updates, staleness_mean, staleness_max)."""
+        ctx = mp.get_context('fork')
+        n = self.n_workers
+        per_worker = len(dataset) // n
+        index = np.random.permutation(len(dataset)) if shuffle else np.arange(len(dataset))
+        with dezero.no_grad():
+            self.model(np.array([dataset[i][0] for i in index[:1]]))
+
+        shm = share_params(self.model)
+        counters = shared_memory.SharedMemory(create=True, size=8 * n)
+        results = ctx.Queue()
+        try:
+            np.ndarray((n,), dtype=np.int64, buffer=counters.buf)[...] = 0
+            procs = [ctx.Process(target=self._worker,
+                                 args=(rank, Shard(dataset, index[rank * per_worker:(rank + 1) * per_worker]),
+                                       batch_size, max_epoch, shuffle, counters, results))
+                     for rank in range(n)]
+            start = time.perf_counter()
+            for p in procs:
+                p.start()
+            reports = _gather(results, procs, n)
+            for p in procs:
+                p.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            unshare_params(self.model, shm)
+            counters.close()
+            counters.unlink()
+
+        errors = [r for r in reports if 'error' in r]
+        if errors:
+            raise RuntimeError('worker {} failed:\n{}'.format(errors[0]['rank'], errors[0]['error']))
+        reports.sort(key=lambda r: r['rank'])
+        samples = sum(r['samples'] for r in reports)
+        return {'samples_per_sec': samples / elapsed, 'time': elapsed,
+                'loss': sum(r['sum_loss'] for r in reports) / samples,
+                'workers': reports}
+
+    def _worker(self, rank, shard, batch_size, max_epoch, shuffle, counters, results):
+        try:
+            np.random.seed(rank)
+            model, optimizer = self.model, self.optimizer
+            updates = np.ndarray((self.n_workers,), dtype=np.int64, buffer=counters.buf)
+            loader = DataLoader(shard, batch_size, shuffle=shuffle)
+            staleness = []
+            sum_loss, samples = 0.0, 0
+            start = time.perf_counter()
+            for epoch in range(max_epoch):
+                for x, t in loader:
+                    version = updates.sum()
+                    loss = self.loss_fn(model(x), t)
+                    model.cleargrads()
+                    loss.backward()
+                    optimizer.update() # 공유 매개변수에 잠금 없이 바로 반영
+                    updates[rank] += 1 # 자기 칸만 쓰므로 경쟁 없음
+                    staleness.append(updates.sum() - version - 1)
+                    sum_loss += float(loss.data) * len(t)
+                    samples += len(t)
+            elapsed = time.perf_counter() - start
+            staleness = np.array(staleness or [0])
+            results.put({'rank': rank, 'samples': samples, 'time': elapsed,
+                         'samples_per_sec': samples / elapsed, 'sum_loss': sum_loss,
+                         'updates': int(updates[rank]),
+                         'staleness_mean': float(staleness.mean()),
+                         'staleness_max': int(staleness.max())})
+            del updates
+        except Exception:
+            import traceback
+            results.put({'rank': rank, 'error': traceback.format_exc()})
@@ -1,58 +1,99 @@
 import numpy as np
-from dezero.core import Function, Variable, as_variable, as_array
+from dezero.core import Function, Variable, as_variable, as_array, \
+    using_config, no_grad, fork, Config
 from dezero import utils
+from dezero import pool
 
 class Sin(Function):
+    __slots__ = ()
+    saved_inputs = (0,)
+    saved_output = False
+
     def forward(self, x):
-        y = np.sin(x)
+        y = pool.apply(np.sin, x)
         return y
     
     def backward(self, gy):
         x, = self.inputs # x = self.inputs[0]
         gx = gy * cos(x) # Dezero의 cos함수
         return gx
+
+    def jvp(self, xs, y, ts):
+        return np.cos(xs[0]) * ts[0]
         
 class Cos(Function):
+    __slots__ = ()
+    saved_inputs = (0,)
+    saved_output = False
+
     def forward(self, x):
-        y = np.cos(x)
+        y = pool.apply(np.cos, x)
         return y
     
     def backward(self, gy):
         x, = self.inputs
         gx = gy * -sin(x)
         return gx
+
+    def jvp(self, xs, y, ts):
+        return -np.sin(xs[0]) * ts[0]
     
 class Tanh(Function):
+    __slots__ = ()
+    saved_inputs = ()
+    saved_output = True
+
     def forward(self, x):
-        y = np.tanh(x)
+        y = pool.apply(np.tanh, x)
         return y
     
     def backward(self, gy):
         y = self.outputs[0]() # 약한 참조때문에 그 값에 접근하려고 () 추가
         gx = gy * (1 - y * y)
         return gx
+
+    def jvp(self, xs, y, ts):
+        return (1 - y * y) * ts[0]
     
 class Exp(Function):
+    __slots__ = ()
+    saved_inputs = ()
+    saved_output = True
+
     def forward(self, x):
-        y = np.exp(x)
+        y = pool.apply(np.exp, x)
         return y
     
     def backward(self, gy):
         y = self.outputs[0]() ## 약한 참조때문에 그 값에 접근하려고 () 추가
         gx = gy * y
         return gx
+
+    def jvp(self, xs, y, ts):
+        return y * ts[0]
     
 class Log(Function):
+    __slots__ = ()
+    saved_inputs = (0,)
+    saved_output = False
+
     def forward(self, x):
-        y = np.log(x)
+        y = pool.apply(np.log, x)
         return y
     
     def backward(self, gy):
         x, = self.inputs
         gx = gy / x
         return gx
+
+    def jvp(self, xs, y, ts):
+        return ts[0] / xs[0]
     
 class Reshape(Function):
+    __slots__ = ('shape', 'x_shape')
+    saved_inputs = ()
+    saved_output = False
+
     def __init__(self, shape):
         self.shape = shape
         
@@ -64,7 +105,14 @@ class Reshape(Function):
     def backward(self, gy):
         return reshape(gy, self.x_shape)
 
+    def jvp(self, xs, y, ts):
+        return ts[0].reshape(self.shape)
+
 class Transpose(Function):
+    __slots__ = ()
+    saved_inputs = ()
+    saved_output = False
+
     def forward(self, x):
         y = np.transpose(x)
         return y
@@ -72,6 +120,9 @@ class Transpose(Function):
     def backward(self, gy):
         gx = transpose(gy)
         return gx
+
+    def jvp(self, xs, y, ts):
+        return np.transpose(ts[0])
     
 # # 축 고려하는 Transpose
 # class Transpose(Function):
@@ -94,6 +145,10 @@ class Transpose(Function):
 #     return Transpose(axes)(x)
 
 class GetItem(Function):
+    __slots__ = ('slices',)
+    saved_inputs = (0,)
+    saved_output = False
+
     def __init__(self, slices):
         self.slices = slices
     
@@ -105,21 +160,35 @@ class GetItem(Function):
         x, = self.inputs
         f = GetItemGrad(self.slices, x.shape)
         return f(gy)
+
+    def jvp(self, xs, y, ts):
+        return ts[0][self.slices]
     
 class GetItemGrad(Function):
+    __slots__ = ('slices', 'in_shape')
+    saved_inputs = ()
+    saved_output = False
+
     def __init__(self, slices, in_shape):
         self.slices = slices
         self.in_shape = in_shape
         
     def forward(self, gy):
-        gx = np.zeros(self.in_shape)
+        gx = pool.zeros(self.in_shape, gy.dtype)
         np.add.at(gx, self.slices, gy)
         return gx
     
     def backward(self, ggx):
         return get_item(ggx, self.slices)
 
+    def jvp(self, xs, y, ts):
+        return self.forward(ts[0]) # 선형 함수이므로 tangent에 forward를 그대로 적용
+
 class Sum(Function):
+    __slots__ = ('axis', 'keepdims', 'x_shape')
+    saved_inputs = ()
+    saved_output = False
+
     def __init__(self, axis, keepdims):
         self.axis = axis
         self.keepdims = keepdims
@@ -133,8 +202,15 @@ class Sum(Function):
         gy = utils.reshape_sum_backward(gy, self.x_shape, self.axis, self.keepdims)
         gx = broadcast_to(gy, self.x_shape)
         return gx
+
+    def jvp(self, xs, y, ts):
+        return ts[0].sum(axis=self.axis, keepdims=self.keepdims)
     
 class BroadcastTo(Function):
+    __slots__ = ('shape', 'x_shape')
+    saved_inputs = ()
+    saved_output = False
+
     def __init__(self, shape):
         self.shape = shape
         
@@ -147,7 +223,12 @@ class BroadcastTo(Function):
         gx = sum_to(gy, self.x_shape)
         return gx
 
+    def jvp(self, xs, y, ts):
+        return np.broadcast_to(ts[0], self.shape)
+
 class SumTo(Function):
+    __slots__ = ('shape', 'x_shape')
+
     def __init__(self, shape):
         self.shape = shape
     
@@ -155,17 +236,32 @@ class SumTo(Function):
         self.x_shape = x.shape
         y = utils.sum_to(x, self.shape)
         return y
+
+    def backward(self, gy):
+        gx = broadcast_to(gy, self.x_shape)
+        return gx
+
+    def jvp(self, xs, y, ts):
+        return utils.sum_to(ts[0], self.shape)
     
 class MatMul(Function):
+    __slots__ = ()
+    saved_inputs = (0, 1)
+    saved_output = False
+
     def forward(self, x, W):
-        y = x.dot(W)
+        y = pool.dot(x, W)
         return y
     
     def backward(self, gy):
         x, W = self.inputs
+        gW = fork(matmul, x.T, gy) # gx와 독립이므로 backward_threads면 동시에 계산
         gx = matmul(gy, W.T)
-        gW = matmul(x.T, gy)
-        return gx, gW
+        return gx, gW.result()
+
+    def jvp(self, xs, y, ts):
+        (x, W), (tx, tW) = xs, ts
+        return tx.dot(W) + x.dot(tW)
 
 def linear_simple(x, W, b=None):
     t = matmul(x, W)
@@ -177,20 +273,35 @@ def linear_simple(x, W, b=None):
     return y
 
 class Linear(Function):
+    __slots__ = ()
+    saved_inputs = (0, 1, 2)
+    saved_output = False
+
     def forward(self, x, W, b):
-        y = x.dot(W)
+        y = pool.dot(x, W)
         if b is not None:
             y += b
         return y
     
     def backward(self, gy):
         x, W, b = self.inputs
+        gW = fork(matmul, x.T, gy) # gx와 독립이므로 backward_threads면 동시에 계산
         gb = None if b.data is None else sum_to(gy, b.shape)
         gx = matmul(gy, W.T)
-        gW = matmul(x.T, gy)
-        return gx, gW, gb
+        return gx, gW.result(), gb
+
+    def jvp(self, xs, y, ts):
+        (x, W, b), (tx, tW, tb) = xs, ts
+        ty = tx.dot(W) + x.dot(tW)
+        if b is not None:
+            ty += tb
+        return ty
         
 class MeanSquaredError(Function):
+    __slots__ = ()
+    saved_inputs = (0, 1)
+    saved_output = False
+
     def forward(self, x0, x1):
         diff = x0 - x1
         y = (diff ** 2).sum() / len(diff)
@@ -202,6 +313,11 @@ class MeanSquaredError(Function):
         gx0 = gy * diff * (2. / len(diff))
         gx1 = -gx0
         return gx0, gx1
+
+    def jvp(self, xs, y, ts):
+        (x0, x1), (t0, t1) = xs, ts
+        diff = x0 - x1
+        return (diff * (t0 - t1)).sum() * (2. / len(diff))
     
 def sigmoid_simple(x):
     x = as_variable(x)
@@ -209,9 +325,17 @@ def sigmoid_simple(x):
     return y
     
 class Sigmoid(Function):
+    __slots__ = ()
+    saved_inputs = ()
+    saved_output = True
+
     def forward(self, x):
         # y = 1 / (1 + exp(-x))
-        y = np.tanh(x * 0.5) * 0.5 + 0.5 # Better implementation
+        # y = np.tanh(x * 0.5) * 0.5 + 0.5 # Better implementation
+        y = pool.apply(np.multiply, x, 0.5) # 같은 식을 버퍼 하나로 in-place 계산
+        np.tanh(y, out=y)
+        y *= 0.5
+        y += 0.5
         return y
     
     def backward(self, gy):
@@ -219,9 +343,16 @@ class Sigmoid(Function):
         gx = gy * y * (1 - y)
         return gx
 
+    def jvp(self, xs, y, ts):
+        return y * (1 - y) * ts[0]
+
 class ReLU(Function):
+    __slots__ = ()
+    saved_inputs = (0,)
+    saved_output = False
+
     def forward(self, x):
-        y = np.maximum(x, 0.0)
+        y = pool.apply(np.maximum, x, 0.0)
         return y
     
     def backward(self, gy):
@@ -230,6 +361,9 @@ class ReLU(Function):
         gx = gy * mask
         return gx
 
+    def jvp(self, xs, y, ts):
+        return ts[0] * (xs[0] > 0)
+
 def softmax_simple(x, axis=1):
     x = as_variable(x)
     y = exp(x)
@@ -237,6 +371,8 @@ def softmax_simple(x, axis=1):
     return y / sum_y
 
 class Softmax(Function):
+    __slots__ = ('axis',)
+
     def __init__(self, axis=1):
         self.axis = axis
         
@@ -245,6 +381,17 @@ class Softmax(Function):
         y = np.exp(y)
         y /= y.sum(axis=self.axis, keepdims=True)
         return y
+
+    def backward(self, gy):
+        y = self.outputs[0]()
+        gx = y * gy
+        sumdx = gx.sum(axis=self.axis, keepdims=True)
+        gx -= y * sumdx
+        return gx
+
+    def jvp(self, xs, y, ts):
+        yt = y * ts[0]
+        return yt - y * yt.sum(axis=self.axis, keepdims=True)
     
 def softmax_cross_entropy_simple(x, t):
     x, t = as_variable(x), as_variable(t)
@@ -258,6 +405,10 @@ def softmax_cross_entropy_simple(x, t):
     return y
 
 class SoftmaxCrossEntropy(Function):
+    __slots__ = ()
+    saved_inputs = (0, 1)
+    saved_output = False
+
     def forward(self, x, t):
         N = x.shape[0]
         log_z = utils.logsumexp(x, axis=1)
@@ -273,11 +424,24 @@ class SoftmaxCrossEntropy(Function):
         gy *= 1 / N
         y = softmax(x)
         
-        t_onehot = np.eye(CLS_NUM, dtype=t.dtype)[t.data]
+        # t_onehot = np.eye(CLS_NUM, dtype=t.dtype)[t.data]
+        t_onehot = pool.zeros((N, CLS_NUM), x.dtype)
+        t_onehot[np.arange(N), t.data.ravel()] = 1
         y = (y - t_onehot) * gy
         return y
+
+    def jvp(self, xs, y, ts):
+        x, t = xs
+        N = x.shape[0]
+        p = np.exp(x - utils.logsumexp(x, axis=1))
+        p[np.arange(N), t.ravel()] -= 1
+        return (p * ts[0]).sum() / N
         
 class Max(Function):
+    __slots__ = ('axis', 'keepdims')
+    saved_inputs = (0,)
+    saved_output = True
+
     def __init__(self, axis=None, keepdims=False):
         self.axis = axis
         self.keepdims = keepdims
@@ -296,13 +460,24 @@ class Max(Function):
         cond = (x.data == y.data)
         gy = broadcast_to(gy, cond.shape)
         return gy * cond
+
+    def jvp(self, xs, y, ts):
+        x, = xs
+        cond = x == y.reshape(utils.max_backward_shape(x, self.axis))
+        return (ts[0] * cond).sum(axis=self.axis, keepdims=self.keepdims)
     
 class Min(Max):
+    __slots__ = ()
+
     def forward(self, x):
         y = x.min(axis=self.axis, keepdims=self.keepdims)
         return y
     
 class Clip(Function):
+    __slots__ = ('x_min', 'x_max')
+    saved_inputs = (0,)
+    saved_output = False
+
     def __init__(self, x_min, x_max):
         self.x_min = x_min
         self.x_max = x_max
@@ -316,7 +491,49 @@ class Clip(Function):
         mask = (x.data >= self.x_min) * (x.data <= self.x_max)
         gx = gy * mask
         return gx
+
+    def jvp(self, xs, y, ts):
+        x, = xs
+        return ts[0] * ((x >= self.x_min) & (x <= self.x_max))
     
+class Checkpoint(Function):
+    """Run `f` without keeping its graph and recompute it during backward.
+    Only the inputs of `f` are stored; the activations inside `f` are
+    rebuilt from them when the gradient arrives. Gradients of parameters
+    used by `f` are accumulated by the recomputed graph.
+    """
+    __slots__ = ('f',)
+    saved_output = False
+
+    def __init__(self, f):
+        self.f = f
+
+    def forward(self, *xs):
+        with no_grad():
+            y = self.f(*[Variable(x) for x in xs])
+        return y.data
+
+    def backward(self, gy):
+        if Config.enable_backdrop:
+            # 재계산 그래프가 원래 입력과 이어지지 않으므로 2차 미분은 지원하지 않는다
+            raise NotImplementedError('create_graph=True is not supported through checkpoint')
+        xs = [Variable(x.data) for x in self.inputs]
+        for x, x_in in zip(xs, self.inputs): # forward-over-reverse(hvp)용 tangent
+            x.tangent = x_in.tangent
+        with using_config('enable_backdrop', True): # 재계산 (이번에는 그래프를 만든다)
+            y = self.f(*xs)
+        y.grad = gy
+        y.backward()
+        gxs = tuple(x.grad for x in xs)
+        return gxs if len(gxs) > 1 else gxs[0]
+
+    def jvp(self, xs, y, ts):
+        duals = [Variable(x) for x in xs]
+        for x, t in zip(duals, ts):
+            x.tangent = t
+        with no_grad(): # f를 tangent와 함께 한 번 더 실행
+            return self.f(*duals).tangent
+
 def sin(x):
     return Sin()(x)
 
@@ -387,6 +604,9 @@ def min(x, axis=None, keepdims=False):
 def clip(x, x_min, x_max):
     return Clip(x_min, x_max)(x)
 
+def checkpoint(f, *xs):
+    return Checkpoint(f)(*xs)
+
 def accuracy(y, t):
     # 내부 계산은 ndarray 인스턴스를 사용해서 수행하므로
     # 미분 불가능
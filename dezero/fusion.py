@@ -0,0 +1,288 @@
+import numpy as np
+import dezero.functions as F
+from dezero import utils
+from dezero import pool
+from dezero.core import Parameter, Add, Mul, Neg, Sub, Div, Pow
+
+# =============================================================================
+# Elementwise step kernels
+# 체인 값 a (연쇄되는 쪽 입력), 다른 입력 b, 결과 r
+# forward(a, b, out)         : out에 결과를 쓴다 (out은 a와 같은 버퍼일 수 있다)
+# backward(g, a, b, r, need) -> gb : g(= dL/dr)를 in-place로 dL/da로 바꾸고
+#                                   need이면 dL/db를 새 배열로 반환
+# pos: 체인 값이 Function 입력의 몇 번째인지 (Sub / Div는 순서가 중요)
+# =============================================================================
+def _add_forward(a, b, out):
+    np.add(a, b, out=out)
+
+def _add_backward(g, a, b, r, need):
+    return g.copy() if need else None
+
+def _mul_forward(a, b, out):
+    np.multiply(a, b, out=out)
+
+def _mul_backward(g, a, b, r, need):
+    gb = g * a if need else None
+    np.multiply(g, b, out=g)
+    return gb
+
+def _sub_forward(a, b, out):
+    np.subtract(a, b, out=out)
+
+def _sub_backward(g, a, b, r, need):
+    return -g if need else None
+
+def _rsub_forward(a, b, out):
+    np.subtract(b, a, out=out)
+
+def _rsub_backward(g, a, b, r, need):
+    gb = g.copy() if need else None
+    np.negative(g, out=g)
+    return gb
+
+def _div_forward(a, b, out):
+    np.divide(a, b, out=out)
+
+def _div_backward(g, a, b, r, need):
+    gb = -g * r / b if need else None
+    np.divide(g, b, out=g)
+    return gb
+
+def _rdiv_forward(a, b, out):
+    np.divide(b, a, out=out)
+
+def _rdiv_backward(g, a, b, r, need):
+    gb = g / a if need else None
+    np.multiply(g, r, out=g)
+    np.divide(g, a, out=g)
+    np.negative(g, out=g)
+    return gb
+
+def _neg_forward(a, b, out):
+    np.negative(a, out=out)
+
+def _neg_backward(g, a, b, r, need):
+    np.negative(g, out=g)
+
+def _exp_forward(a, b, out):
+    np.exp(a, out=out)
+
+def _exp_backward(g, a, b, r, need):
+    g *= r
+
+def _tanh_forward(a, b, out):
+    np.tanh(a, out=out)
+
+def _tanh_backward(g, a, b, r, need):
+    g *= 1 - r * r
+
+def _sigmoid_forward(a, b, out):
+    np.multiply(a, 0.5, out=out)
+    np.tanh(out, out=out)
+    out *= 0.5
+    out += 0.5
+
+def _sigmoid_backward(g, a, b, r, need):
+    g *= r * (1 - r)
+
+def _pow_kernels(c):
+    def forward(a, b, out):
+        np.power(a, c, out=out)
+
+    def backward(g, a, b, r, need):
+        g *= c * a ** (c - 1)
+    return forward, backward
+
+# {(Function 클래스, pos): (forward, backward, backward에 a 필요, backward에 r 필요)}
+elementwise_kernels = {
+    (Add, 0): (_add_forward, _add_backward, False, False),
+    (Add, 1): (_add_forward, _add_backward, False, False),
+    (Mul, 0): (_mul_forward, _mul_backward, True, False),
+    (Mul, 1): (_mul_forward, _mul_backward, True, False),
+    (Sub, 0): (_sub_forward, _sub_backward, False, False),
+    (Sub, 1): (_rsub_forward, _rsub_backward, False, False),
+    (Div, 0): (_div_forward, _div_backward, False, True),
+    (Div, 1): (_rdiv_forward, _rdiv_backward, True, True),
+    (Neg, 0): (_neg_forward, _neg_backward, False, False),
+    (Pow, 0): (None, None, True, False), # 지수 c는 Function마다 다르므로 _pow_kernels로 생성
+    (F.Exp, 0): (_exp_forward, _exp_backward, False, True),
+    (F.Tanh, 0): (_tanh_forward, _tanh_backward, False, True),
+    (F.Sigmoid, 0): (_sigmoid_forward, _sigmoid_backward, False, True),
+}
+
+class FusedElementwise:
+    """A chain of elementwise Functions evaluated as a single kernel.
+    Forward runs every step with `out=` ufunc calls on one working buffer
+    and only materializes the intermediates that a later backward step
+    reads. The working buffer and the saved intermediates are allocated on
+    the first replay and reused afterwards (tape shapes are fixed); the
+    chain output and the gradient come from dezero.pool. Backward walks the chain in reverse,
+    updating a single gradient buffer in place.
+    Args:
+        steps (list): (Function, pos) pairs in execution order. `pos` is the
+            input index through which the chain value enters the Function.
+        needs_grad (list): Whether each non-chain input needs a gradient.
+        y (ndarray): Output captured for the chain, giving shape and dtype.
+    """
+    def __init__(self, steps, needs_grad, y):
+        self.steps = steps
+        self.needs_grad = needs_grad
+        self.shape, self.dtype = y.shape, y.dtype
+        self.kernels = []
+        saved = set()
+        for i, (f, pos) in enumerate(steps):
+            forward, backward, needs_a, needs_r = elementwise_kernels[
+                Pow if isinstance(f, Pow) else type(f), pos]
+            if isinstance(f, Pow):
+                forward, backward = _pow_kernels(f.c)
+            self.kernels.append((forward, backward))
+            if needs_a:
+                saved.add(i)
+            if needs_r:
+                saved.add(i + 1)
+        # 단계 i의 입력(= 단계 i-1의 출력)을 backward까지 보관할지 여부
+        self.saved = [i in saved for i in range(len(steps))]
+        self.arity = [len(f.inputs) - 1 for f, _ in steps]
+        needs = iter(needs_grad)
+        self.needs = [next(needs) if n else False for n in self.arity]
+        self.vals = None
+        self.buffers = {} # 단계 번호 -> 재사용 버퍼 ('work'는 공용 작업 버퍼)
+
+    def __repr__(self):
+        return 'FusedElementwise({})'.format(
+            ', '.join(f.__class__.__name__ for f, _ in self.steps))
+
+    def _split(self, xs):
+        # xs = (chain 입력, 다른 입력들...) -> 단계별 다른 입력 b (없으면 None)
+        a, others = xs[0], iter(xs[1:])
+        bs = [next(others) if n else None for n in self.arity]
+        return a, bs
+
+    def _buffer(self, key):
+        buf = self.buffers.get(key)
+        if buf is None:
+            buf = self.buffers[key] = np.empty(self.shape, dtype=self.dtype)
+        return buf
+
+    def forward(self, *xs):
+        a, bs = self._split(xs)
+        vals = [a]
+        last = len(self.kernels) - 1
+        for i, ((forward, _), b) in enumerate(zip(self.kernels, bs)):
+            if i == last: # 출력은 Tape의 Variable이 가지므로 매번 새 배열 (pool에서)
+                out = pool.empty(self.shape, self.dtype)
+            elif self.saved[i + 1]:
+                out = self._buffer(i)
+            else:
+                out = self._buffer('work')
+            forward(a, b, out)
+            a = out
+            vals.append(a if i + 1 == len(self.kernels) or self.saved[i + 1]
+                        else None)
+        self.vals = vals
+        return a
+
+    def backward(self, xs, y, gy):
+        _, bs = self._split(xs)
+        if self.vals is None: # 융합 후 forward 없이 backward (첫 캡처 / 연속 backward)
+            self.forward(*xs)
+        vals = self.vals
+        vals[0], vals[-1] = xs[0], y
+
+        g = pool.empty(y.shape, y.dtype)
+        np.copyto(g, np.broadcast_to(gy, y.shape))
+        gbs = []
+        for i in reversed(range(len(self.kernels))):
+            _, backward = self.kernels[i]
+            gb = backward(g, vals[i], bs[i], vals[i + 1], self.needs[i])
+            if bs[i] is not None:
+                gbs.append(utils.sum_to(gb, bs[i].shape)
+                           if gb is not None and gb.shape != bs[i].shape
+                           else gb)
+        gbs.reverse()
+        self.vals = None
+        return (g, *gbs)
+
+def _fused_backward(f, xs, y, gy):
+    return f.backward(xs, y, gy)
+
+def _chain_pos(f, x, y):
+    # f의 입력 x가 체인 값이 될 수 있으면 그 입력 위치를, 아니면 None
+    if x.data is None or f.inputs.count(x) != 1:
+        return None
+    pos = 0 if isinstance(f, Pow) else f.inputs.index(x)
+    key = (Pow if isinstance(f, Pow) else type(f), pos)
+    if key not in elementwise_kernels:
+        return None
+    if x.data.shape != y.data.shape or x.data.dtype != y.data.dtype:
+        return None # 체인 값은 브로드캐스트 / 형 변환 없이 출력 버퍼에 그대로 쓴다
+    return pos
+
+def _head_pos(f, y):
+    for x in f.inputs:
+        pos = _chain_pos(f, x, y)
+        if pos is not None:
+            return pos
+    return None
+
+def fuse(entries, keep=()):
+    """Merge chains of elementwise tape entries into FusedElementwise entries.
+    A value is folded into a chain only if it has a single consumer and is
+    not listed in `keep`.
+    Args:
+        entries (list): Tape entries (forward, kernel, Function, inputs, y).
+        keep (iterable): Variables whose values must stay materialized.
+    Returns:
+        list: New tape entries.
+    """
+    keep = set(keep)
+    consumers, producer = {}, {}
+    for i, entry in enumerate(entries):
+        producer[entry[4]] = i
+        for x in entry[3]:
+            consumers[x] = consumers.get(x, 0) + 1
+
+    # pos[i]: 체인 값의 입력 위치, prev[i]: 체인에서 바로 앞 entry 번호
+    pos, prev, has_next = {}, {}, set()
+    for i, (_, _, f, inputs, y) in enumerate(entries):
+        for x in inputs:
+            src = producer.get(x)
+            if src is None or x in keep or consumers[x] != 1:
+                continue
+            if src not in pos:
+                head = _head_pos(entries[src][2], x)
+                if head is None:
+                    continue
+                pos[src] = head
+            p = _chain_pos(f, x, y)
+            if p is None:
+                continue
+            pos[i], prev[i] = p, src
+            has_next.add(src)
+            break
+
+    result = []
+    for i, entry in enumerate(entries):
+        if i in has_next:
+            continue # 체인 중간 entry는 마지막 entry 위치에서 한 번에 실행
+        if i not in prev:
+            result.append(entry)
+            continue
+        chain = [i]
+        while chain[-1] in prev:
+            chain.append(prev[chain[-1]])
+        chain.reverse()
+
+        head = entries[chain[0]]
+        inputs = [head[3][pos[chain[0]]]]
+        needs_grad = []
+        for j in chain:
+            for k, x in enumerate(entries[j][3]):
+                if k != pos[j]:
+                    inputs.append(x)
+                    needs_grad.append(x.creator is not None
+                                      or isinstance(x, Parameter))
+        f = FusedElementwise([(entries[j][2], pos[j]) for j in chain],
+                             needs_grad, entry[4].data)
+        result.append((f.forward, _fused_backward, f, inputs, entry[4]))
+    return result
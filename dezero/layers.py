@@ -1,17 +1,34 @@
 import numpy as np
 import weakref
 import dezero.functions as F
-from dezero.core import Parameter
+from dezero.core import Parameter, Config
+from dezero import utils
 
 class Layer:
+    # Parameter / Layer 속성이 바뀔 때마다 증가 (모든 Layer의 named_params 캐시 무효화)
+    _version = 0
+
     def __init__(self):
-        self._params = set()
+        self._params = {} # 속성 이름 -> None (dict는 등록 순서를 유지)
+        self._registry = None
+        self._registry_version = -1
 
     def __setattr__(self, name, value):
+        params = self.__dict__.get('_params')
         if isinstance(value, (Parameter, Layer)):
-            self._params.add(name)
+            params[name] = None
+            Layer._version += 1
+        elif params is not None and name in params: # None 등으로 바뀌면 등록 해제
+            del params[name]
+            Layer._version += 1
         super().__setattr__(name, value)
 
+    def __delattr__(self, name):
+        if name in self._params:
+            del self._params[name]
+            Layer._version += 1
+        super().__delattr__(name)
+
     def __call__(self, *inputs):
         outputs = self.forward(*inputs)
         if not isinstance(outputs, tuple):
@@ -25,25 +42,80 @@ class Layer:
     def forward(self, inputs):
         raise NotImplementedError
 
-    def params(self):
+    def _walk(self, parent_key):
         for name in self._params:
             obj = self.__dict__[name]
-            
+            key = parent_key + '/' + name if parent_key else name
+
             if isinstance(obj, Layer): # Layers에서 매개변수 끄내기
-                yield from obj.params()
+                yield from obj._walk(key)
             else:
-                yield obj
+                yield key, obj
+
+    def _build_registry(self):
+        named, seen = [], set()
+        for key, param in self._walk(''):
+            if id(param) not in seen: # 공유 매개변수는 처음 경로로 한 번만
+                seen.add(id(param))
+                named.append((key, param))
+        self.__dict__['_registry'] = (tuple(named), tuple(p for _, p in named))
+        self.__dict__['_registry_version'] = Layer._version
+
+    def named_params(self):
+        """(path, Parameter) pairs such as ('l0/W', W) in attribute
+        assignment order. The tuple is cached until a Parameter / Layer
+        attribute of any Layer is reassigned or deleted.
+        """
+        if self._registry_version != Layer._version:
+            self._build_registry()
+        return self._registry[0]
+
+    def params(self):
+        """Parameters in the order of `named_params` (cached tuple)."""
+        if self._registry_version != Layer._version:
+            self._build_registry()
+        return self._registry[1]
 
     def cleargrads(self):
         for param in self.params():
             param.cleargrad()
+
+    def _flatten_params(self, params_dict, parent_key=''):
+        for key, param in self.named_params():
+            params_dict[parent_key + '/' + key if parent_key else key] = param
+
+    def save_weights(self, path):
+        """Write all initialized parameters to `path` in a flat, aligned
+        format indexed by parameter path (e.g. 'l0/W'); see utils.save_arrays."""
+        params_dict = {}
+        self._flatten_params(params_dict)
+        utils.save_arrays(path, {key: param.data for key, param in params_dict.items()
+                                 if param.data is not None})
+
+    def load_weights(self, path, mmap_mode='c'):
+        """Map the parameters saved by `save_weights` without copying.
+        Every `param.data` becomes a view of one `np.memmap` of the file, so
+        loading costs no reads up front and processes loading the same file
+        share its page cache.
+        Args:
+            path (str): File written by save_weights.
+            mmap_mode (str): 'c' (copy-on-write, in-place updates stay
+                private), 'r' (read-only) or 'r+' (updates go to the file).
+        """
+        arrays = utils.load_arrays(path, mmap_mode)
+        params_dict = {}
+        self._flatten_params(params_dict)
+        for key, param in params_dict.items():
+            if key not in arrays:
+                raise KeyError('{} not found in {}'.format(key, path))
+            param.data = arrays[key]
     
 class Linear(Layer):
-    def __init__(self, out_size, nobias=False, dtype=np.float32, in_size=None):
+    def __init__(self, out_size, nobias=False, dtype=None, in_size=None):
         super().__init__()
         self.in_size = in_size
         self.out_size = out_size
-        self.dtype = dtype
+        self.dtype = Config.dtype if dtype is None else dtype
         
         self.W = Parameter(None, name='W')
         if self.in_size is not None: # in_size가 지정되어 있지 않다면 나중으로 연기
@@ -53,12 +125,17 @@ class Linear(Layer):
             self.b = None
             return None
         
-        self.b = Parameter(np.zeros(out_size, dtype=dtype), name='b')
+        self.b = Parameter(np.zeros(out_size, dtype=self.dtype), name='b')
         return None
     
     def _init_W(self):
         I, O = self.in_size, self.out_size
-        W_data = np.random.randn(I, O).astype(self.dtype) * np.sqrt(1 / I)
+        # float64 난수 행렬 전체를 만들지 않도록 행 단위로 나눠서 채운다 (같은 난수열)
+        W_data = np.empty((I, O), dtype=self.dtype)
+        scale = np.sqrt(1 / I)
+        rows = max(1, 2**16 // O)
+        for i in range(0, I, rows):
+            W_data[i:i + rows] = np.random.randn(min(rows, I - i), O) * scale
         self.W.data = W_data
                 
     def forward(self, x):
@@ -0,0 +1,159 @@
+import gc
+import sys
+import warnings
+from dezero.core import Variable, Parameter, Function
+
+def _live_nodes():
+    variables, functions = [], []
+    for obj in gc.get_objects():
+        if isinstance(obj, Variable):
+            variables.append(obj)
+        elif isinstance(obj, Function):
+            functions.append(obj)
+    return variables, functions
+
+def live_graph():
+    """Count the Variables / Functions alive in the process.
+    Returns:
+        dict: 'variables', 'functions', 'bytes' (arrays pinned by
+        non-parameter Variables, shared arrays counted once), 'parameters'
+        and 'parameter_bytes'.
+    """
+    variables, functions = _live_nodes()
+    arrays, param_arrays = {}, {}
+    n_params = 0
+    for v in variables:
+        if isinstance(v, Parameter):
+            n_params += 1
+            if v.data is not None:
+                param_arrays[id(v.data)] = v.data.nbytes
+        elif v.data is not None:
+            arrays[id(v.data)] = v.data.nbytes
+    return {'variables': len(variables) - n_params, 'functions': len(functions),
+            'bytes': sum(arrays.values()), 'parameters': n_params,
+            'parameter_bytes': sum(param_arrays.values())}
+
+def _subgraph(root):
+    funcs = [root.creator]
+    seen_funcs = {root.creator}
+    seen_vars = {id(root)}
+    arrays = {}
+    if root.data is not None:
+        arrays[id(root.data)] = root.data.nbytes
+    while funcs:
+        f = funcs.pop()
+        for x in f.inputs:
+            if id(x) in seen_vars:
+                continue
+            seen_vars.add(id(x))
+            if x.data is not None and not isinstance(x, Parameter):
+                arrays[id(x.data)] = x.data.nbytes
+            if x.creator is not None and x.creator not in seen_funcs:
+                funcs.append(x.creator)
+                seen_funcs.add(x.creator)
+    return len(seen_funcs), len(seen_vars), sum(arrays.values())
+
+def _referrers(obj, ignore):
+    # obj를 붙잡고 있는 곳: dict(모듈 전역 / 인스턴스 속성)는 키 이름으로 표시
+    names = []
+    for r in gc.get_referrers(obj):
+        if id(r) in ignore or type(r).__name__ == 'frame':
+            continue
+        if isinstance(r, dict):
+            keys = [k for k, v in r.items() if v is obj]
+            names.extend('{}[{!r}]'.format(type(r).__name__, k) for k in keys)
+        elif isinstance(r, Function):
+            continue # 그래프 내부 참조
+        else:
+            names.append(type(r).__name__)
+    return names
+
+def largest_subgraphs(k=5):
+    """Find the biggest graphs kept alive and what references them.
+    A root is a live Variable with a creator that is not an input of any
+    live Function, e.g. a loss kept in `sum_loss += loss`.
+    Args:
+        k (int): Number of subgraphs to return.
+    Returns:
+        list: dicts with 'root', 'functions', 'variables', 'bytes' and
+        'referrers', largest first.
+    """
+    variables, functions = _live_nodes()
+    consumed = set()
+    for f in functions:
+        if hasattr(f, 'inputs'):
+            consumed.update(id(x) for x in f.inputs)
+    roots = [v for v in variables if v.creator is not None and id(v) not in consumed]
+    del variables, functions
+
+    graphs = []
+    for root in roots:
+        n_funcs, n_vars, nbytes = _subgraph(root)
+        graphs.append({'root': root, 'functions': n_funcs, 'variables': n_vars,
+                       'bytes': nbytes})
+    graphs.sort(key=lambda g: (g['bytes'], g['functions']), reverse=True)
+    graphs = graphs[:k]
+    ignore = {id(roots), id(graphs), *(id(g) for g in graphs), id(sys._getframe())}
+    for g in graphs:
+        g['referrers'] = _referrers(g['root'], ignore)
+    return graphs
+
+def dump_subgraphs(k=5):
+    """Return `largest_subgraphs(k)` as a text table."""
+    lines = ['{:>10s} {:>10s} {:>12s}  {:24s} {}'.format(
+        'functions', 'variables', 'bytes', 'root', 'referenced by')]
+    for g in largest_subgraphs(k):
+        root = g['root']
+        name = '{}{} {}'.format(root.creator.__class__.__name__,
+                                '' if root.name is None else ' ' + root.name,
+                                None if root.data is None else root.shape)
+        lines.append('{:10d} {:10d} {:12,d}  {:24s} {}'.format(
+            g['functions'], g['variables'], g['bytes'], name,
+            ', '.join(g['referrers']) or '-'))
+    return '\n'.join(lines)
+
+class GraphMonitor:
+    """Track the live graph once per training step and warn when it keeps
+    growing.
+    Args:
+        patience (int): Warn after the live Function count has grown for this
+            many consecutive steps.
+    Example:
+        monitor = GraphMonitor()
+        for x, t in train_loader:
+            ...
+            monitor.step()
+    """
+    def __init__(self, patience=3):
+        self.patience = patience
+        self.history = []
+        self.growth = 0
+
+    def step(self):
+        """Record the live graph after a step; return the snapshot."""
+        snapshot = live_graph()
+        if self.history and snapshot['functions'] > self.history[-1]['functions']:
+            self.growth += 1
+        else:
+            self.growth = 0
+        self.history.append(snapshot)
+        if self.growth >= self.patience:
+            first = self.history[-1 - self.growth]
+            warnings.warn(
+                'live graph grew for {} steps: {} -> {} Functions, {:,} -> {:,} '
+                'bytes. A graph is probably kept across iterations (e.g. '
+                '`sum_loss += loss` instead of `loss.data`); see '
+                'dezero.memory.dump_subgraphs().'.format(
+                    self.growth, first['functions'], snapshot['functions'],
+                    first['bytes'], snapshot['bytes']),
+                RuntimeWarning, stacklevel=2)
+        return snapshot
+
+    def report(self):
+        """Per-step table of live nodes and pinned bytes."""
+        lines = ['{:>5s} {:>10s} {:>10s} {:>12s}'.format(
+            'step', 'variables', 'functions', 'bytes')]
+        for i, s in enumerate(self.history):
+            lines.append('{:5d} {:10d} {:10d} {:12,d}'.format(
+                i, s['variables'], s['functions'], s['bytes']))
+        return '\n'.join(lines)
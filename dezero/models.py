@@ -1,25 +1,127 @@
+import numpy as np
 from dezero import Layer
 from dezero import utils
 import dezero.functions as F
 import dezero.layers as L
+from dezero.core import Variable, no_grad
 
 class Model(Layer):
     def plot(self, *inputs, to_file='model.png'):
         y = self.forward(*inputs)
         return utils.plot_dot_graph(y, verbose=True, to_file=to_file)
     
+# compile_inference용 in-place 활성화 커널 (h를 덮어쓴다)
+def _sigmoid_inplace(h):
+    h *= 0.5
+    np.tanh(h, out=h)
+    h *= 0.5
+    h += 0.5
+
+def _tanh_inplace(h):
+    np.tanh(h, out=h)
+
+def _relu_inplace(h):
+    np.maximum(h, 0, out=h)
+
+inplace_activations = {
+    F.sigmoid: _sigmoid_inplace,
+    F.tanh: _tanh_inplace,
+    F.relu: _relu_inplace,
+}
+    
 class MLP(Model):
     def __init__(self, fc_output_sizes, activation=F.sigmoid):
         super().__init__()
         self.activation = activation
         self.layers = []
+        self.segments = None # 체크포인트 구간 [(start, end), ...]
+        self.memory_budget = None
+        self._segment_plan = None # memory_budget으로 정한 (배치 크기, 구간) 캐시
         
         for i, out_size in enumerate(fc_output_sizes):
             layer = L.Linear(out_size)
             setattr(self, 'l' + str(i), layer)
             self.layers.append(layer)
             
+    def checkpoint(self, segments=None, memory_budget=None):
+        """Recompute activations in backward instead of keeping them.
+        Args:
+            segments (list): (start, end) ranges of self.layers to run as
+                checkpointed segments.
+            memory_budget (int): Activation budget in bytes. Segments are
+                chosen at the next forward from the batch size
+                (see utils.checkpoint_segments).
+        """
+        self.segments = segments
+        self.memory_budget = memory_budget
+        self._segment_plan = None
+        return self
+    
+    def _plan_segments(self, x):
+        # 층마다 Linear 출력 + 활성화 출력 두 개를 보관한다고 추정
+        itemsize = np.dtype(self.layers[0].dtype).itemsize
+        sizes = [2 * len(x) * l.out_size * itemsize for l in self.layers]
+        return utils.checkpoint_segments(sizes, self.memory_budget)
+    
+    def _forward_layers(self, start, end, x):
+        for i in range(start, end):
+            x = self.layers[i](x)
+            if i < len(self.layers) - 1:
+                x = self.activation(x)
+        return x
+            
     def forward(self, x):
-        for l in self.layers[:-1]:
-            x = self.activation(l(x))
-        return  self.layers[-1](x)
+        segments = self.segments
+        if self.memory_budget is not None:
+            if self._segment_plan is None or self._segment_plan[0] != len(x):
+                self._segment_plan = (len(x), self._plan_segments(x))
+            segments = self._segment_plan[1]
+        if segments is None:
+            return self._forward_layers(0, len(self.layers), x)
+        
+        for start, end in segments:
+            x = F.checkpoint(
+                lambda h, start=start, end=end: self._forward_layers(start, end, h), x)
+        return x
+
+    
+    def compile_inference(self):
+        """Return a NumPy-only predict function for this MLP.
+        The returned callable runs x.dot(W) + b and the activation in place on
+        output buffers preallocated per batch size, without creating Variable
+        or Function objects. Parameter arrays are bound by reference, so in-place
+        optimizer updates are picked up; rebinding `param.data` needs a
+        recompile.
+        Returns:
+            callable: predict(x) -> ndarray. The result is an internal buffer
+            that the next call with the same batch size overwrites, so
+            compile one function per serving thread.
+        """
+        if any(l.W.data is None for l in self.layers):
+            raise RuntimeError('Call the model once (or give in_size) before compile_inference')
+        params = [(l.W.data, None if l.b is None else l.b.data) for l in self.layers]
+        dtype = params[0][0].dtype
+        last = len(params) - 1
+        activation = inplace_activations.get(self.activation)
+        if activation is None: # 알 수 없는 활성화 함수는 그래프 없이 그대로 호출
+            def activation(h, f=self.activation):
+                with no_grad():
+                    h[...] = f(Variable(h)).data
+        buffers = {} # 배치 크기 -> 층별 출력 버퍼
+        
+        def predict(x):
+            x = np.asarray(x, dtype=dtype)
+            bufs = buffers.get(len(x))
+            if bufs is None:
+                bufs = [np.empty((len(x), W.shape[1]), dtype=dtype) for W, _ in params]
+                buffers[len(x)] = bufs
+            h = x
+            for i, ((W, b), out) in enumerate(zip(params, bufs)):
+                np.dot(h, W, out=out)
+                if b is not None:
+                    out += b
+                if i < last:
+                    activation(out)
+                h = out
+            return h
+        return predict
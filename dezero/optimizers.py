@@ -1,15 +1,124 @@
+import math
 import numpy as np
+from dezero.core import Variable, Config
+
+class FlatParams:
+    """One contiguous buffer for the data and gradients of `params`.
+    Every `param.data` becomes a view into `data`; `gather_grads` packs the
+    gradients into `grad` with a single concatenate. Parameters whose data
+    was rebound elsewhere (load_weights, Snapshot.restore) are copied back
+    into the buffer, so flat mode does not work with parameters shared
+    with other processes (distributed.share_params; HogwildTrainer rejects
+    it). The gradient copy costs one extra pass, so this pays off for many
+    small parameters, not for a few large ones.
+    Args:
+        params (list): Initialized Parameters of the same dtype.
+        block_size (int): Elements per block of the fused update. Blocks
+            keep the working set of one update in cache.
+    """
+    def __init__(self, params, block_size=2**16):
+        if any(p.data is None for p in params):
+            raise ValueError('initialize the parameters (run a forward) before flattening')
+        dtypes = {p.data.dtype for p in params}
+        if len(dtypes) != 1:
+            raise ValueError('parameters have mixed dtypes {}'.format(dtypes))
+        self.params = params
+        self.dtype = dtypes.pop()
+        self.size = sum(p.data.size for p in params)
+        self.data = np.empty(self.size, dtype=self.dtype)
+        self.grad = np.zeros(self.size, dtype=self.dtype)
+        self.work = np.empty(self.size, dtype=self.dtype) # 최적화 기법의 작업 버퍼
+        self.views = []
+        offset = 0
+        for param in params:
+            view = self.data[offset:offset + param.data.size].reshape(param.data.shape)
+            view[...] = param.data
+            param.data = view
+            self.views.append(view)
+            offset += view.size
+        self.blocks = [slice(lo, lo + block_size)
+                       for lo in range(0, self.size, block_size)]
+
+    def slices(self, flat):
+        """Views of the flat array `flat` shaped like each parameter."""
+        views, offset = [], 0
+        for view in self.views:
+            views.append(flat[offset:offset + view.size].reshape(view.shape))
+            offset += view.size
+        return views
+
+    def gather_grads(self):
+        """Pack param.grad into `grad`; False if a gradient is missing."""
+        grads = []
+        for param, view in zip(self.params, self.views):
+            if param.data is not view: # 다른 곳에서 data를 바꿔 끼운 경우 버퍼로 되돌린다
+                view[...] = param.data
+                param.data = view
+            if param.grad is None:
+                return False
+            grads.append(param.grad.data.reshape(-1))
+        np.concatenate(grads, out=self.grad)
+        return True
 
 class Optimizer:
+    # 매개변수별 상태 dict 속성 이름 ({id(param): ndarray}) / 스칼라 상태 속성 이름
+    state_dicts = ()
+    state_scalars = ()
+
     def __init__(self):
         self.target = None
         self.hooks = []
+        self.flat = None
+        self.flat_states = {}
         
-    def setup(self, target): # 매개변수를 갖는 클래스(Model / Layer)를 target으로 설정
+    def setup(self, target, flat=False): # 매개변수를 갖는 클래스(Model / Layer)를 target으로 설정
+        """Set the model to optimize.
+        Args:
+            target (dezero.Layer): Model / Layer.
+            flat (bool): Pack parameters into one FlatParams buffer so that
+                `update` runs a few vectorized ops over all of them
+                (parameters must be initialized).
+        """
         self.target = target
+        if flat:
+            self.flat = FlatParams(list(target.params()))
+            self.flat_states = {}
         return self
     
     def update(self):
+        flat = self.flat
+        if flat is not None and type(self).update_flat is not Optimizer.update_flat:
+            # flat 모드: apply_flat을 갖는 hook은 블록 단위로 갱신과 함께 실행
+            fused = [f for f in self.hooks if hasattr(f, 'apply_flat')]
+            params = [p for p in flat.params if p.grad is not None]
+            for f in self.hooks:
+                if not hasattr(f, 'apply_flat'):
+                    f(params)
+            if flat.gather_grads():
+                pending = []
+                for f in fused:
+                    if hasattr(f, 'prepare_flat'):
+                        # 전역 reduction은 앞선 hook이 적용된 기울기를 봐야 한다
+                        if pending:
+                            self._apply_flat_hooks(pending)
+                            pending = []
+                        f.prepare_flat(flat.data, flat.grad)
+                    pending.append(f)
+                states = [self.flat_state(name) for name in self.state_dicts]
+                for s in flat.blocks:
+                    data, grad, tmp = flat.data[s], flat.grad[s], flat.work[s]
+                    for f in pending:
+                        f.apply_flat(data, grad, tmp)
+                    self.update_flat(data, grad, tmp,
+                                     *[state[s] for state in states])
+                return
+            # 기울기가 없는 매개변수가 있으면 매개변수별 갱신
+            for f in fused:
+                f(params)
+            for param in params:
+                self.update_one(param)
+            return
+
         # None 이외의 매개변수를 리스트에 모아둠
         params = [p for p in self.target.params() if p.grad is not None]
         
@@ -24,9 +133,71 @@ class Optimizer:
             
     def update_one(self, param):
         raise NotImplementedError()
+
+    def _apply_flat_hooks(self, hooks):
+        flat = self.flat
+        for s in flat.blocks:
+            for f in hooks:
+                f.apply_flat(flat.data[s], flat.grad[s], flat.work[s])
+
+    def update_flat(self, data, grad, tmp, *states):
+        # flat 모드의 한 블록을 갱신: grad / tmp는 덮어써도 되는 작업 버퍼,
+        # states는 state_dicts 순서의 상태 배열 (재정의하지 않으면 update_one을 사용)
+        raise NotImplementedError()
+
+    def flat_state(self, name):
+        """Flat array for the per-parameter state dict `name` in flat mode.
+        The dict entries become views of it, so state_dict / update_one keep
+        working; existing values are copied in.
+        """
+        flat = self.flat_states.get(name)
+        if flat is None:
+            flat = np.zeros(self.flat.size, dtype=self.flat.dtype)
+            d = getattr(self, name)
+            for param, view in zip(self.flat.params, self.flat.slices(flat)):
+                if id(param) in d:
+                    view[...] = d[id(param)]
+                d[id(param)] = view
+            self.flat_states[name] = flat
+        return flat
     
     def add_hook(self, f):
         self.hooks.append(f)
+
+    def state_dict(self):
+        """Optimizer state keyed by stable names instead of id(param).
+        Returns:
+            dict: {'<state>/<param path>': ndarray} for per-parameter state
+            and {'<state>': 0-d ndarray} for scalar state.
+        """
+        params_dict = {}
+        self.target._flatten_params(params_dict)
+        state = {}
+        for name in self.state_dicts:
+            d = getattr(self, name)
+            for path, param in params_dict.items():
+                if id(param) in d:
+                    state[name + '/' + path] = d[id(param)]
+        for name in self.state_scalars:
+            state[name] = np.array(getattr(self, name))
+        return state
+
+    def load_state_dict(self, state):
+        """Restore state written by `state_dict` (arrays are copied)."""
+        params_dict = {}
+        self.target._flatten_params(params_dict)
+        for key, value in state.items():
+            name, _, path = key.partition('/')
+            if name in self.state_scalars:
+                setattr(self, name, value.item())
+            elif name in self.state_dicts:
+                d, key = getattr(self, name), id(params_dict[path])
+                if key in d and d[key].shape == value.shape:
+                    d[key][...] = value # flat 모드의 view는 유지
+                else:
+                    d[key] = np.array(value)
+            else:
+                raise KeyError('unknown optimizer state {}'.format(key))
         
 class SGD(Optimizer):
     def __init__(self, lr=0.01):
@@ -35,8 +206,14 @@ class SGD(Optimizer):
         
     def update_one(self, param):
         param.data -= self.lr * param.grad.data
+
+    def update_flat(self, data, grad, tmp):
+        grad *= self.lr
+        data -= grad
         
 class MomentumSGD(Optimizer):
+    state_dicts = ('vs',)
+
     def __init__(self, lr=0.01, momentum=0.9):
         super().__init__()
         self.lr = lr
@@ -51,4 +228,195 @@ class MomentumSGD(Optimizer):
         v = self.vs[v_key]
         v *= self.momentum
         v -= self.lr * param.grad.data
-        param.data += v
\ No newline at end of file
+        param.data += v
+
+    def update_flat(self, data, grad, tmp, v):
+        v *= self.momentum
+        grad *= self.lr
+        v -= grad
+        data += v
+        
+class AdaGrad(Optimizer):
+    state_dicts = ('hs',)
+
+    def __init__(self, lr=0.001, eps=1e-8):
+        super().__init__()
+        self.lr = lr
+        self.eps = eps
+        self.hs = {}
+
+    def update_one(self, param):
+        h_key = id(param)
+        if h_key not in self.hs:
+            self.hs[h_key] = np.zeros_like(param.data)
+
+        h = self.hs[h_key]
+        grad = param.grad.data
+        h += grad * grad
+        param.data -= self.lr * grad / (np.sqrt(h) + self.eps)
+
+    def update_flat(self, data, grad, tmp, h):
+        np.multiply(grad, grad, out=tmp)
+        h += tmp
+        np.sqrt(h, out=tmp)
+        tmp += self.eps
+        grad *= self.lr
+        grad /= tmp
+        data -= grad
+
+class Adam(Optimizer):
+    state_dicts = ('ms', 'vs')
+    state_scalars = ('t',)
+
+    def __init__(self, alpha=0.001, beta1=0.9, beta2=0.999, eps=1e-8):
+        super().__init__()
+        self.t = 0
+        self.alpha = alpha
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+        self.ms = {}
+        self.vs = {}
+
+    def update(self, *args, **kwargs):
+        self.t += 1
+        super().update(*args, **kwargs)
+
+    @property
+    def lr(self):
+        fix1 = 1. - math.pow(self.beta1, self.t)
+        fix2 = 1. - math.pow(self.beta2, self.t)
+        return self.alpha * math.sqrt(fix2) / fix1
+
+    def update_one(self, param):
+        key = id(param)
+        if key not in self.ms:
+            self.ms[key] = np.zeros_like(param.data)
+            self.vs[key] = np.zeros_like(param.data)
+
+        m, v = self.ms[key], self.vs[key]
+        beta1, beta2, eps = self.beta1, self.beta2, self.eps
+        grad = param.grad.data
+
+        m += (1 - beta1) * (grad - m)
+        v += (1 - beta2) * (grad * grad - v)
+        param.data -= self.lr * m / (np.sqrt(v) + eps)
+
+    def update_flat(self, data, grad, tmp, m, v):
+        beta1, beta2 = self.beta1, self.beta2
+        # m += (1 - beta1) * (grad - m)
+        np.subtract(grad, m, out=tmp)
+        tmp *= 1 - beta1
+        m += tmp
+        # v += (1 - beta2) * (grad * grad - v)
+        np.multiply(grad, grad, out=tmp)
+        tmp -= v
+        tmp *= 1 - beta2
+        v += tmp
+        # data -= lr * m / (sqrt(v) + eps)
+        np.sqrt(v, out=tmp)
+        tmp += self.eps
+        np.divide(m, tmp, out=tmp)
+        tmp *= self.lr
+        data -= tmp
+        
+# =============================================================================
+# Hook functions
+# __call__(params)              : 매개변수별 경로. 기울기는 다른 매개변수와 배열을
+#                                 공유할 수 있으므로 in-place로 바꾸지 않고 새 Variable로 교체
+# prepare_flat(data, grad)      : (선택) flat 모드에서 전체 기울기에 대한 전역 reduction
+# apply_flat(data, grad, tmp)   : flat 모드의 블록마다 update_flat 직전에 grad를 in-place로 변경
+# =============================================================================
+def _flat_grads(params):
+    return np.concatenate([p.grad.data.reshape(-1) for p in params])
+
+class WeightDecay:
+    """L2 regularization: grad += rate * param."""
+    def __init__(self, rate):
+        self.rate = rate
+
+    def __call__(self, params):
+        for param in params:
+            param.grad = Variable(param.grad.data + self.rate * param.data)
+
+    def apply_flat(self, data, grad, tmp):
+        np.multiply(data, self.rate, out=tmp)
+        grad += tmp
+
+class ClipGradByGlobalNorm:
+    """Scale all gradients so that their global L2 norm is at most `max_norm`.
+    The norm is a single dot product over every gradient.
+    """
+    def __init__(self, max_norm, eps=1e-6):
+        self.max_norm = max_norm
+        self.eps = eps
+        self.rate = 1.
+
+    def _rate(self, grad):
+        total_norm = math.sqrt(float(np.dot(grad, grad)))
+        return min(self.max_norm / (total_norm + self.eps), 1.)
+
+    def __call__(self, params):
+        if not params:
+            return
+        rate = self._rate(_flat_grads(params))
+        if rate < 1:
+            for param in params:
+                param.grad = Variable(param.grad.data * param.grad.data.dtype.type(rate))
+
+    def prepare_flat(self, data, grad):
+        self.rate = self._rate(grad)
+
+    def apply_flat(self, data, grad, tmp):
+        if self.rate < 1:
+            grad *= self.rate
+
+class ClipGradByValue:
+    """Clip every gradient element into [lower, upper]."""
+    def __init__(self, lower, upper):
+        self.lower = lower
+        self.upper = upper
+
+    def __call__(self, params):
+        for param in params:
+            param.grad = Variable(np.clip(param.grad.data, self.lower, self.upper))
+
+    def apply_flat(self, data, grad, tmp):
+        np.clip(grad, self.lower, self.upper, out=grad)
+
+class LossScaler:
+    """Loss scaling for float16 gradient storage (Config.storage_dtype).
+    The loss gradient is multiplied by `scale` so small gradients do not
+    underflow in float16; `step` unscales them in the parameter dtype and
+    skips the update when any gradient overflowed. With `dynamic`, the
+    scale is halved on overflow and doubled after `growth_interval`
+    clean steps.
+    """
+    def __init__(self, scale=2.**15, dynamic=True, growth_interval=1000):
+        self.scale = scale
+        self.dynamic = dynamic
+        self.growth_interval = growth_interval
+        self.good_steps = 0
+        
+    def backward(self, loss):
+        # float16 손실에서는 scale 자체가 넘칠 수 있으므로 계산용 dtype으로 시작
+        dtype = np.promote_types(loss.dtype, Config.dtype)
+        loss.grad = Variable(np.full(loss.shape, self.scale, dtype=dtype))
+        loss.backward()
+        
+    def step(self, optimizer):
+        params = [p for p in optimizer.target.params() if p.grad is not None]
+        finite = all(np.isfinite(p.grad.data).all() for p in params)
+        if finite:
+            for param in params:
+                param.grad = Variable(
+                    param.grad.data.astype(param.data.dtype) / param.data.dtype.type(self.scale))
+            optimizer.update()
+            self.good_steps += 1
+            if self.dynamic and self.good_steps >= self.growth_interval:
+                self.scale *= 2
+                self.good_steps = 0
+        elif self.dynamic:
+            self.scale /= 2
+            self.good_steps = 0
+        return finite
@@ -0,0 +1,97 @@
+import numpy as np
+import dezero.functions as F
+from dezero import static
+from dezero.core import Parameter, Add, Sub, Mul
+
+# =============================================================================
+# Per-example gradient rules
+# rule(f, pos, xs, gy) -> ndarray (N, *param.shape)
+#   f  : 파라미터를 입력으로 받은 Function, pos: 파라미터의 입력 위치
+#   xs : 입력 ndarray 리스트, gy: 배치 backward에서 받은 출력 기울기 (N, ...)
+# 예제 사이에 섞이는 연산이 없으면 gy의 n번째 행은 n번째 예제의 손실에서만 온다
+# =============================================================================
+def _batched_sum_to(g, shape):
+    # g (N, ...)를 예제별로 shape에 맞게 합한다 (배치 축 0은 남긴다)
+    shape = tuple(shape)
+    if len(shape) > g.ndim - 1 and shape[0] != 1:
+        raise ValueError('parameter of shape {} is not broadcast over the batch'
+                         .format(shape))
+    target = ((1,) * (g.ndim - len(shape)) + shape)[-g.ndim:]
+    axes = tuple(i for i in range(1, g.ndim) if target[i] == 1 and g.shape[i] != 1)
+    if axes:
+        g = g.sum(axis=axes, keepdims=True)
+    return g.reshape((len(g),) + shape)
+
+def _linear_rule(f, pos, xs, gy):
+    x = xs[0]
+    if pos == 0:
+        raise NotImplementedError('per-example gradient of the Linear input')
+    if pos == 1: # 예제별 외적 x_n^T gy_n
+        return np.einsum('ni,no->nio', x, gy)
+    return _batched_sum_to(gy, xs[2].shape)
+
+def _add_rule(f, pos, xs, gy):
+    return _batched_sum_to(gy, xs[pos].shape)
+
+def _sub_rule(f, pos, xs, gy):
+    return _batched_sum_to(gy if pos == 0 else -gy, xs[pos].shape)
+
+def _mul_rule(f, pos, xs, gy):
+    return _batched_sum_to(gy * xs[1 - pos], xs[pos].shape)
+
+per_example_rules = {
+    F.Linear: _linear_rule,
+    F.MatMul: _linear_rule,
+    Add: _add_rule,
+    Sub: _sub_rule,
+    Mul: _mul_rule,
+}
+
+def per_example_grads(loss, params, reduction='mean'):
+    """Gradients of every example's loss in one batched backward pass.
+    The graph must not mix examples before the loss (MLP with elementwise
+    activations and F.softmax_cross_entropy / F.mean_squared_error are
+    fine); the gradient that reaches each parameter's Function is then split
+    by row and combined with the matching input row, e.g. with a batched
+    outer product for Linear.
+    Args:
+        loss (dezero.Variable): Scalar loss over a batch of N examples.
+        params (iterable): Parameters to differentiate.
+        reduction (str): 'mean' if `loss` averages the example losses,
+            'sum' if it adds them.
+    Returns:
+        list: ndarray of shape (N, *param.shape) for each parameter. The
+        usual summed gradients are left in param.grad.
+    """
+    if reduction not in ('mean', 'sum'):
+        raise ValueError('reduction must be "mean" or "sum"')
+    params = list(params)
+    index = {p: i for i, p in enumerate(params)}
+    funcs = [f for f in static.trace(loss)
+             if any(x in index for x in f.inputs)]
+    for f in funcs:
+        if type(f) not in per_example_rules:
+            raise NotImplementedError('{} is not supported for per-example '
+                                      'gradients'.format(f.__class__.__name__))
+
+    loss.backward(retain_grad=True)
+
+    grads = [None] * len(params)
+    N = None
+    for f in funcs:
+        gy = f.outputs[0]().grad.data
+        xs = [x.data for x in f.inputs]
+        N = len(gy)
+        for pos, x in enumerate(f.inputs):
+            i = index.get(x)
+            if i is None:
+                continue
+            g = per_example_rules[type(f)](f, pos, xs, gy)
+            grads[i] = g if grads[i] is None else grads[i] + g # 공유된 파라미터
+
+    for i, p in enumerate(params):
+        if grads[i] is None:
+            grads[i] = np.zeros((N or 0,) + p.shape, dtype=p.dtype)
+        elif reduction == 'mean': # grads[i]는 y.grad의 view일 수 있으므로 in-place 금지
+            grads[i] = grads[i] * N
+    return grads
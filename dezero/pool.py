@@ -0,0 +1,147 @@
+import math
+import threading
+import weakref
+import collections
+import numpy as np
+
+class BufferPool:
+    """Shape/dtype-keyed pool of reusable ndarray buffers.
+    Arrays handed out by the pool are views over a raw `bytearray`. When the
+    last view of an array dies, its storage goes back to the free list and
+    the next request with the same shape and dtype reuses it instead of
+    calling the system allocator. Free buffers are evicted in LRU order once
+    they exceed `capacity` bytes.
+    Args:
+        capacity (int): Upper bound of bytes kept in the free list. Kept
+            small by default so freed buffers do not hold on to the memory
+            that release_unsaved / checkpointing give back.
+        min_bytes (int): Smaller arrays bypass the pool.
+    """
+    def __init__(self, capacity=64 * 2**20, min_bytes=2**16):
+        self.capacity = capacity
+        self.min_bytes = min_bytes
+        self.enabled = True
+        self.free = collections.OrderedDict() # (shape, dtype) -> [bytearray]
+        self.free_bytes = 0
+        self.returned = [] # finalize 콜백은 여기에만 쌓고 다음 요청 때 정리
+        self.lock = threading.Lock() # free 리스트는 여러 스레드가 공유
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_reused = 0
+        self.bytes_allocated = 0
+        self.evictions = 0
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'bytes_reused': self.bytes_reused,
+                'bytes_allocated': self.bytes_allocated,
+                'evictions': self.evictions, 'free_bytes': self.free_bytes}
+
+    def _drain(self):
+        while self.returned:
+            key, raw = self.returned.pop()
+            if len(raw) > self.capacity:
+                continue
+            while self.free_bytes + len(raw) > self.capacity:
+                old_key, bufs = next(iter(self.free.items()))
+                self.free_bytes -= len(bufs.pop())
+                self.evictions += 1
+                if not bufs:
+                    del self.free[old_key]
+            self.free.setdefault(key, []).append(raw)
+            self.free.move_to_end(key)
+            self.free_bytes += len(raw)
+
+    def empty(self, shape, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        shape = tuple(shape)
+        nbytes = math.prod(shape) * dtype.itemsize
+        if not self.enabled or nbytes < self.min_bytes:
+            return np.empty(shape, dtype=dtype)
+
+        key = (shape, dtype)
+        with self.lock:
+            if self.returned:
+                self._drain()
+            bufs = self.free.get(key)
+            if bufs:
+                raw = bufs.pop()
+                if not bufs:
+                    del self.free[key]
+                self.free_bytes -= nbytes
+                self.hits += 1
+                self.bytes_reused += nbytes
+            else:
+                raw = None
+                self.misses += 1
+                self.bytes_allocated += nbytes
+        if raw is None:
+            raw = bytearray(nbytes)
+
+        flat = np.frombuffer(raw, dtype=dtype)
+        # flat의 view들은 모두 flat을 base로 참조하므로 flat이 사라지면 더 이상 쓰는 곳이 없다
+        weakref.finalize(flat, self.returned.append, (key, raw))
+        return flat.reshape(shape)
+
+    def zeros(self, shape, dtype=np.float64):
+        y = self.empty(shape, dtype)
+        y.fill(0)
+        return y
+
+    def ones(self, shape, dtype=np.float64):
+        y = self.empty(shape, dtype)
+        y.fill(1)
+        return y
+
+    def clear(self):
+        with self.lock:
+            self._drain()
+            self.free.clear()
+            self.free_bytes = 0
+
+default_pool = BufferPool()
+
+def empty(shape, dtype=np.float64):
+    return default_pool.empty(shape, dtype)
+
+def zeros(shape, dtype=np.float64):
+    return default_pool.zeros(shape, dtype)
+
+def ones(shape, dtype=np.float64):
+    return default_pool.ones(shape, dtype)
+
+def apply(ufunc, *xs):
+    """Evaluate `ufunc(*xs)` into a pooled output buffer.
+    Small operands and non-float results (where the ufunc may pick another
+    output dtype than np.result_type) use a plain call. The result is always
+    an ndarray (0-d for scalar operands), so callers may update it in place.
+    """
+    pool = default_pool
+    if not pool.enabled:
+        return np.asarray(ufunc(*xs))
+    for x in xs:
+        if isinstance(x, np.ndarray) and x.nbytes >= pool.min_bytes:
+            break
+    else:
+        return np.asarray(ufunc(*xs)) # 0-d 입력이면 ufunc는 NumPy 스칼라를 반환
+    dtype = np.result_type(*xs)
+    if dtype.kind != 'f':
+        return np.asarray(ufunc(*xs))
+    shape = np.broadcast_shapes(*[x.shape for x in xs
+                                  if isinstance(x, np.ndarray)])
+    return ufunc(*xs, out=pool.empty(shape, dtype))
+
+def dot(x, W):
+    """x.dot(W) into a pooled output buffer (2-D operands)."""
+    pool = default_pool
+    if not pool.enabled or x.ndim != 2 or W.ndim != 2:
+        return x.dot(W)
+    dtype = np.result_type(x, W)
+    if dtype.kind != 'f':
+        return x.dot(W)
+    return np.dot(x, W, out=pool.empty((x.shape[0], W.shape[1]), dtype))
@@ -0,0 +1,102 @@
+import json
+import time
+import contextlib
+import numpy as np
+from dezero.core import using_config
+
+class Profiler:
+    """Per-Function timing collected from Function.__call__ and
+    Variable.backward while `Config.profiler` is set (see `profile`).
+    Forward rows count Functions called by user code. Backward rows time
+    each `f.backward`; the Functions that a backward calls internally are
+    kept in the trace (category 'backward.op') but not in the table, so
+    their time is not counted twice.
+    """
+    def __init__(self):
+        self.events = [] # (name, category, start ns, duration ns, input shapes, output shapes, bytes)
+        self.backward_depth = 0
+        self.origin = time.perf_counter_ns()
+
+    def record(self, f, phase, start, xs, ys):
+        end = time.perf_counter_ns()
+        if phase == 'forward' and self.backward_depth:
+            phase = 'backward.op'
+        nbytes = 0
+        for y in ys:
+            # 입력의 view(reshape, transpose 등)는 새 메모리가 아니므로 제외.
+            # pool에서 받은 출력은 y.base가 있으므로 .base로는 판단할 수 없다
+            if isinstance(y, np.ndarray) and not any(
+                    isinstance(x, np.ndarray) and np.may_share_memory(y, x) for x in xs):
+                nbytes += y.nbytes
+        self.events.append((f.__class__.__name__, phase, start, end - start,
+                            [_shape(x) for x in xs], [_shape(y) for y in ys],
+                            nbytes))
+
+    def stats(self):
+        """Return {(name, phase): {'calls', 'time', 'bytes', 'shapes'}} with
+        time in seconds, for the 'forward' and 'backward' phases."""
+        table = {}
+        for name, phase, _, dur, in_shapes, out_shapes, nbytes in self.events:
+            if phase == 'backward.op':
+                continue
+            row = table.setdefault((name, phase), {'calls': 0, 'time': 0.0,
+                                                   'bytes': 0, 'shapes': set()})
+            row['calls'] += 1
+            row['time'] += dur * 1e-9
+            row['bytes'] += nbytes
+            row['shapes'].add((tuple(in_shapes), tuple(out_shapes)))
+        return table
+
+    def summary(self, sort_by='time', limit=None):
+        """Return the per-Function table as text, sorted by total time."""
+        table = sorted(self.stats().items(), key=lambda kv: -kv[1][sort_by])
+        total = sum(row['time'] for _, row in table) or 1.0
+        lines = ['{:24s} {:9s} {:>7s} {:>11s} {:>11s} {:>6s} {:>11s}  {}'.format(
+            'function', 'phase', 'calls', 'total (ms)', 'mean (us)', '%',
+            'alloc (MB)', 'shapes (in -> out)')]
+        for (name, phase), row in table[:limit]:
+            in_shapes, out_shapes = next(iter(row['shapes']))
+            shapes = '{} -> {}'.format(', '.join(map(str, in_shapes)),
+                                       ', '.join(map(str, out_shapes)))
+            if len(row['shapes']) > 1:
+                shapes += ' (+{} more)'.format(len(row['shapes']) - 1)
+            lines.append('{:24s} {:9s} {:7d} {:11.3f} {:11.1f} {:6.1f} {:11.2f}  {}'.format(
+                name, phase, row['calls'], row['time'] * 1e3,
+                row['time'] / row['calls'] * 1e6, row['time'] / total * 100,
+                row['bytes'] / 2**20, shapes))
+        return '\n'.join(lines)
+
+    def export_chrome_trace(self, path):
+        """Write the events in Chrome trace format (chrome://tracing, Perfetto).
+        Args:
+            path (str): Output JSON file.
+        Returns:
+            str: `path`.
+        """
+        events = []
+        for name, phase, start, dur, in_shapes, out_shapes, nbytes in self.events:
+            events.append({'name': name, 'cat': phase, 'ph': 'X', 'pid': 0, 'tid': 0,
+                           'ts': (start - self.origin) / 1e3, 'dur': dur / 1e3,
+                           'args': {'inputs': [str(s) for s in in_shapes],
+                                    'outputs': [str(s) for s in out_shapes],
+                                    'bytes': nbytes}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+def _shape(x):
+    return None if x is None else getattr(x, 'shape', ())
+
+@contextlib.contextmanager
+def profile():
+    """Profile the Functions run inside the block (in the current thread).
+    Example:
+        with dezero.profiler.profile() as prof:
+            loss = F.softmax_cross_entropy(model(x), t)
+            loss.backward()
+        print(prof.summary())
+        prof.export_chrome_trace('/tmp/trace.json')
+    """
+    prof = Profiler()
+    with using_config('profiler', prof):
+        yield prof
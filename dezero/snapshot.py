@@ -0,0 +1,112 @@
+import os
+import json
+import numpy as np
+from dezero import utils
+
+class Snapshot:
+    """Resumable training snapshots written incrementally.
+    A snapshot holds the model parameters, the optimizer state (keyed by
+    parameter path), the DataLoader permutation and position, and the NumPy
+    RNG state. Two slot files are used alternately: the first save of a slot
+    writes it with utils.save_arrays, later saves copy the arrays into the
+    memory-mapped file in place. `latest.json` is replaced atomically once a
+    slot is complete, so a crash while saving leaves the previous snapshot
+    valid.
+    Args:
+        directory (str): Directory for the snapshot files.
+        model (dezero.Layer): Model to save / restore.
+        optimizer (dezero.optimizers.Optimizer): Optional optimizer.
+        loader (dezero.dataloaders.DataLoader): Optional data loader.
+        sync (bool): Flush written pages to disk on every save.
+    """
+    def __init__(self, directory, model, optimizer=None, loader=None, sync=True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.model = model
+        self.optimizer = optimizer
+        self.loader = loader
+        self.sync = sync
+        self.mapped = {} # slot -> (signature, {이름: memmap 뷰})
+        latest = self._read_latest()
+        self.slot = 0 if latest is None else 1 - latest['slot']
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_latest(self):
+        if not os.path.exists(self._path('latest.json')):
+            return None
+        with open(self._path('latest.json')) as f:
+            return json.load(f)
+
+    def _collect(self):
+        arrays = {}
+        params_dict = {}
+        self.model._flatten_params(params_dict)
+        for key, param in params_dict.items():
+            if param.data is not None:
+                arrays['model/' + key] = param.data
+        if self.optimizer is not None:
+            for key, value in self.optimizer.state_dict().items():
+                arrays['optimizer/' + key] = value
+        if self.loader is not None:
+            arrays['loader/index'] = self.loader.index
+        arrays['rng/keys'] = np.random.get_state()[1]
+        return arrays
+
+    def save(self, **meta):
+        """Write a snapshot; `meta` (JSON values such as epoch) is returned
+        by `restore`."""
+        arrays = self._collect()
+        slot, self.slot = self.slot, 1 - self.slot
+        path = self._path('slot{}.bin'.format(slot))
+        signature = {key: (a.dtype.str, a.shape) for key, a in arrays.items()}
+
+        mapped = self.mapped.get(slot)
+        if mapped is None or mapped[0] != signature:
+            self.mapped.pop(slot, None)
+            utils.save_arrays(path, arrays)
+            self.mapped[slot] = (signature, utils.load_arrays(path, 'r+'))
+        else: # 같은 구성이면 매핑된 파일에 값만 복사
+            views = mapped[1]
+            for key, a in arrays.items():
+                np.copyto(views[key], a)
+            if self.sync and views:
+                next(iter(views.values())).flush()
+
+        name, _, pos, has_gauss, cached_gaussian = np.random.get_state()
+        latest = {'slot': slot, 'meta': meta,
+                  'loader_iteration': None if self.loader is None else self.loader.iteration,
+                  'rng': [name, int(pos), int(has_gauss), float(cached_gaussian)]}
+        tmp_path = self._path('latest.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(latest, f)
+        os.replace(tmp_path, self._path('latest.json'))
+
+    def restore(self):
+        """Load the latest snapshot into the model, optimizer, loader and RNG.
+        Returns:
+            dict: The `meta` given to `save`, or None without a snapshot.
+        """
+        latest = self._read_latest()
+        if latest is None:
+            return None
+        arrays = utils.load_arrays(self._path('slot{}.bin'.format(latest['slot'])), 'r')
+
+        params_dict = {}
+        self.model._flatten_params(params_dict)
+        for key, param in params_dict.items():
+            if 'model/' + key in arrays:
+                param.data = np.array(arrays['model/' + key])
+        if self.optimizer is not None:
+            self.optimizer.load_state_dict(
+                {key[len('optimizer/'):]: a for key, a in arrays.items()
+                 if key.startswith('optimizer/')})
+        if self.loader is not None:
+            self.loader.load_state_dict({'index': arrays['loader/index'],
+                                         'iteration': latest['loader_iteration']})
+        name, pos, has_gauss, cached_gaussian = latest['rng']
+        np.random.set_state((name, np.array(arrays['rng/keys']), pos, has_gauss,
+                             cached_gaussian))
+        self.slot = 1 - latest['slot']
+        return latest['meta']
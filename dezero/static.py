@@ -0,0 +1,293 @@
+import numpy as np
+import dezero.functions as F
+from dezero import utils
+from dezero import fusion
+from dezero.core import Variable, Parameter, Add, Mul, Neg, Sub, Div, Pow, \
+    as_array, no_grad
+
+# =============================================================================
+# NumPy backward kernels
+# kernel(f, xs, y, gy) -> tuple of gx (ndarray / None)
+#   f : 캡처된 Function (forward에서 저장한 shape 등의 속성 사용)
+#   xs: 입력 ndarray 리스트, y: 출력 ndarray, gy: 출력 기울기 ndarray
+# 커널이 없는 Function은 Variable 기반 f.backward로 대체한다
+# =============================================================================
+def _sum_to(gx, shape):
+    if gx.shape == shape:
+        return gx
+    return utils.sum_to(gx, shape)
+
+def _add_backward(f, xs, y, gy):
+    return _sum_to(gy, f.x0_shape), _sum_to(gy, f.x1_shape)
+
+def _mul_backward(f, xs, y, gy):
+    x0, x1 = xs
+    return _sum_to(gy * x1, f.x0_shape), _sum_to(gy * x0, f.x1_shape)
+
+def _neg_backward(f, xs, y, gy):
+    return -gy,
+
+def _sub_backward(f, xs, y, gy):
+    return _sum_to(gy, f.x0_shape), _sum_to(-gy, f.x1_shape)
+
+def _div_backward(f, xs, y, gy):
+    x0, x1 = xs
+    gx0 = gy / x1
+    gx1 = gy * (-x0 / x1 ** 2)
+    return _sum_to(gx0, f.x0_shape), _sum_to(gx1, f.x1_shape)
+
+def _pow_backward(f, xs, y, gy):
+    x, = xs
+    return f.c * x ** (f.c - 1) * gy,
+
+def _sin_backward(f, xs, y, gy):
+    return gy * np.cos(xs[0]),
+
+def _cos_backward(f, xs, y, gy):
+    return gy * -np.sin(xs[0]),
+
+def _tanh_backward(f, xs, y, gy):
+    return gy * (1 - y * y),
+
+def _exp_backward(f, xs, y, gy):
+    return gy * y,
+
+def _log_backward(f, xs, y, gy):
+    return gy / xs[0],
+
+def _reshape_backward(f, xs, y, gy):
+    return gy.reshape(f.x_shape),
+
+def _transpose_backward(f, xs, y, gy):
+    return np.transpose(gy),
+
+def _get_item_backward(f, xs, y, gy):
+    gx = np.zeros(xs[0].shape, dtype=gy.dtype)
+    np.add.at(gx, f.slices, gy)
+    return gx,
+
+def _sum_backward(f, xs, y, gy):
+    gy = utils.reshape_sum_backward(gy, f.x_shape, f.axis, f.keepdims)
+    return np.broadcast_to(gy, f.x_shape),
+
+def _broadcast_to_backward(f, xs, y, gy):
+    return _sum_to(gy, f.x_shape),
+
+def _sum_to_backward(f, xs, y, gy):
+    return np.broadcast_to(gy, f.x_shape),
+
+def _matmul_backward(f, xs, y, gy):
+    x, W = xs
+    return gy.dot(W.T), x.T.dot(gy)
+
+def _linear_backward(f, xs, y, gy):
+    x, W, b = xs
+    gb = None if b is None else _sum_to(gy, b.shape)
+    return gy.dot(W.T), x.T.dot(gy), gb
+
+def _mean_squared_error_backward(f, xs, y, gy):
+    x0, x1 = xs
+    diff = x0 - x1
+    gx0 = gy * diff * (2. / len(diff))
+    return gx0, -gx0
+
+def _sigmoid_backward(f, xs, y, gy):
+    return gy * y * (1 - y),
+
+def _relu_backward(f, xs, y, gy):
+    return gy * (xs[0] > 0),
+
+def _softmax_cross_entropy_backward(f, xs, y, gy):
+    x, t = xs
+    N = x.shape[0]
+    p = np.exp(x - x.max(axis=1, keepdims=True))
+    p /= p.sum(axis=1, keepdims=True)
+    p[np.arange(N), t.ravel()] -= 1
+    p *= gy / N
+    return p,
+
+def _clip_backward(f, xs, y, gy):
+    x, = xs
+    return gy * ((x >= f.x_min) & (x <= f.x_max)),
+
+backward_kernels = {
+    Add: _add_backward,
+    Mul: _mul_backward,
+    Neg: _neg_backward,
+    Sub: _sub_backward,
+    Div: _div_backward,
+    Pow: _pow_backward,
+    F.Sin: _sin_backward,
+    F.Cos: _cos_backward,
+    F.Tanh: _tanh_backward,
+    F.Exp: _exp_backward,
+    F.Log: _log_backward,
+    F.Reshape: _reshape_backward,
+    F.Transpose: _transpose_backward,
+    F.GetItem: _get_item_backward,
+    F.Sum: _sum_backward,
+    F.BroadcastTo: _broadcast_to_backward,
+    F.SumTo: _sum_to_backward,
+    F.MatMul: _matmul_backward,
+    F.Linear: _linear_backward,
+    F.MeanSquaredError: _mean_squared_error_backward,
+    F.Sigmoid: _sigmoid_backward,
+    F.ReLU: _relu_backward,
+    F.SoftmaxCrossEntropy: _softmax_cross_entropy_backward,
+    F.Clip: _clip_backward,
+}
+
+def _fallback_backward(f, xs, y, gy):
+    # 커널이 없는 Function: 캡처한 Variable의 data가 최신이므로 f.backward를 그대로 쓴다
+    with no_grad():
+        gxs = f.backward(Variable(as_array(gy)))
+    if not isinstance(gxs, tuple):
+        gxs = (gxs,)
+    return tuple(None if gx is None else gx.data for gx in gxs)
+
+# =============================================================================
+# Tape
+# =============================================================================
+def trace(output):
+    """Collect the Functions that produced `output` in execution order.
+    Args:
+        output (dezero.Variable): Output of the graph.
+    Returns:
+        list: Functions sorted by generation (a valid topological order).
+    """
+    funcs = []
+    seen_set = set()
+    stack = [output.creator]
+    while stack:
+        f = stack.pop()
+        if f is None or f in seen_set:
+            continue
+        seen_set.add(f)
+        funcs.append(f)
+        stack.extend(x.creator for x in f.inputs)
+    funcs.sort(key=lambda f: f.generation)
+    return funcs
+
+class Tape:
+    """Forward / backward program of a captured graph.
+    Every entry is (forward kernel, backward kernel, Function, input
+    Variables, output Variable). The Variables of the captured graph are reused as
+    storage, so replaying only swaps their `data`.
+    Args:
+        output (dezero.Variable): Scalar output (loss) of the captured graph.
+        fuse (bool): Merge chains of elementwise Functions into single
+            kernels (see dezero.fusion).
+        keep (iterable): Variables that must stay materialized when fusing.
+    """
+    def __init__(self, output, fuse=False, keep=()):
+        self.output = output
+        self.entries = []
+        for f in trace(output):
+            if len(f.outputs) != 1:
+                raise ValueError('{} has multiple outputs'.format(
+                    f.__class__.__name__))
+            y = f.outputs[0]() # 그래프를 유지하기 위해 강한 참조로 보관
+            kernel = backward_kernels.get(type(f), _fallback_backward)
+            self.entries.append((f.forward, kernel, f, f.inputs, y))
+
+        # Function.saved_inputs에 없는 중간 결과는 해제되었을 수 있으므로 다시 계산
+        if any(entry[4].data is None for entry in self.entries):
+            self.forward()
+
+        if fuse:
+            self.entries = fusion.fuse(self.entries, keep=(output, *keep))
+
+        fan_in = {}
+        for entry in self.entries:
+            for x in entry[3]:
+                fan_in[x] = fan_in.get(x, 0) + 1
+
+        # 두 번 이상 기울기를 받는 변수는 누적 버퍼를 미리 할당해 둔다
+        self.buffers = {x: np.empty_like(x.data) for x, n in fan_in.items()
+                        if n > 1 and x.data is not None
+                        and (x.creator is not None or isinstance(x, Parameter))}
+
+    def forward(self):
+        for forward, _, _, inputs, y in self.entries:
+            y.data = as_array(forward(*[x.data for x in inputs]))
+        return self.output
+
+    def backward(self):
+        buffers = self.buffers
+        grads = {self.output: np.ones_like(self.output.data)}
+        accumulated = set()
+
+        for _, kernel, f, inputs, y in reversed(self.entries):
+            gy = grads.pop(y, None)
+            if gy is None:
+                continue
+            xs = [x.data for x in inputs]
+            gxs = kernel(f, xs, y.data, gy)
+
+            for x, gx in zip(inputs, gxs):
+                if gx is None or (x.creator is None and
+                                  not isinstance(x, Parameter)):
+                    continue
+                if x not in grads:
+                    grads[x] = gx
+                    continue
+                buf = buffers[x]
+                if x not in accumulated:
+                    np.copyto(buf, grads[x])
+                    accumulated.add(x)
+                    grads[x] = buf
+                np.add(buf, gx, out=buf)
+
+        for param, g in grads.items():
+            param.grad = Variable(as_array(g))
+
+class StaticGraph:
+    """Capture `loss_fn(model(x), t)` once and replay it on new batches.
+    The first call runs eagerly and records the forward graph into a tape
+    of NumPy kernels. Later calls with inputs of the same shape and dtype
+    replay the tape without building Variables / Functions; other shapes
+    fall back to the eager path.
+    Args:
+        model (dezero.Layer): Model to train.
+        loss_fn (callable): Loss function such as F.softmax_cross_entropy.
+        fuse (bool): Fuse elementwise chains in the captured tape.
+    Returns (on call):
+        tuple: (y, loss) Variables. Gradients are stored in param.grad.
+    """
+    def __init__(self, model, loss_fn, fuse=False):
+        self.model = model
+        self.loss_fn = loss_fn
+        self.fuse = fuse
+        self.tape = None
+        self.signature = None
+
+    def _signature(self, x, t):
+        return x.shape, x.dtype, t.shape, t.dtype
+
+    def capture(self, x, t):
+        self.x, self.t = Variable(x), Variable(t)
+        self.y = self.model(self.x)
+        loss = self.loss_fn(self.y, self.t)
+        self.tape = Tape(loss, fuse=self.fuse, keep=(self.y,))
+        self.signature = self._signature(x, t)
+        return loss
+
+    def eager(self, x, t):
+        y = self.model(x)
+        loss = self.loss_fn(y, t)
+        self.model.cleargrads()
+        loss.backward()
+        return y, loss
+
+    def __call__(self, x, t):
+        x, t = np.asarray(x), np.asarray(t)
+        if self.tape is None:
+            self.capture(x, t)
+        elif self._signature(x, t) != self.signature:
+            return self.eager(x, t)
+        else:
+            self.x.data, self.t.data = x, t
+            self.tape.forward()
+
+        self.tape.backward()
+        return Variable(self.y.data), Variable(self.tape.output.data)
@@ -19,6 +19,17 @@ class Compose:
         for t in self.transforms:
             img = t(img)
         return img
+
+    def batch(self, array):
+        for t in self.transforms:
+            array = t.batch(array)
+        return array
+
+def supports_batch(transform):
+    """Whether `transform.batch` can process examples stacked along axis 0."""
+    if isinstance(transform, Compose):
+        return all(supports_batch(t) for t in transform.transforms)
+    return hasattr(transform, 'batch')
     
 class Normalize:
     """Normalize a NumPy array with mean and standard deviation.
@@ -31,19 +42,29 @@ class Normalize:
         self.mean = mean
         self.std = std
         
-    def __call__(self, array):
+    def _stats(self, shape, dtype):
+        # shape: 예제 하나의 shape
         mean, std = self.mean, self.std
         
         if not np.isscalar(mean):
-            mshape = [1] * array.ndim
-            mshape[0] = len(array) if len(self.mean) == 1 else len(self.mean)
-            mean = np.array(self.mean, dtype=array.dtype).reshape(*mshape)
+            mshape = [1] * len(shape)
+            mshape[0] = shape[0] if len(self.mean) == 1 else len(self.mean)
+            mean = np.array(self.mean, dtype=dtype).reshape(*mshape)
             
         if not np.isscalar(std):
-            rshape = [1] * array.ndim
-            rshape[0] = len(array) if len(self.std) == 1 else len(self.std)
-            std = np.array(self.std, dtype=array.dtype).reshape(*rshape)
+            rshape = [1] * len(shape)
+            rshape[0] = shape[0] if len(self.std) == 1 else len(self.std)
+            std = np.array(self.std, dtype=dtype).reshape(*rshape)
             
+        return mean, std
+
+    def __call__(self, array):
+        mean, std = self._stats(array.shape, array.dtype)
+        return (array - mean) / std
+
+    def batch(self, array):
+        """Normalize a batch of examples stacked along axis 0."""
+        mean, std = self._stats(array.shape[1:], array.dtype)
         return (array - mean) / std
     
 class Flatten:
@@ -52,6 +73,9 @@ class Flatten:
     def __call__(self, array):
         return array.flatten()
 
+    def batch(self, array):
+        return array.reshape(len(array), -1)
+
 class AsType:
     def __init__(self, dtype=np.float32):
         self.dtype = dtype
@@ -59,4 +83,7 @@ class AsType:
     def __call__(self, array):
         return array.astype(self.dtype)
 
+    def batch(self, array):
+        return array.astype(self.dtype)
+
 ToFloat = AsType
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import json
 import subprocess
 import numpy as np
 import urllib.request
@@ -54,6 +55,35 @@ def get_dot_graph(output, verbose=True):
                 
     return 'digraph g {\n' + txt + '}'
 
+def retained_bytes(output):
+    """Bytes of activation data kept alive by the graph behind `output`.
+    Parameters are excluded; arrays shared by several Variables are counted
+    once.
+    Args:
+        output (dezero.Variable): Output of the graph (e.g. the loss).
+    Returns:
+        int: Number of bytes.
+    """
+    from dezero.core import Parameter
+    
+    funcs = [output.creator] if output.creator is not None else []
+    seen_set = set(funcs)
+    arrays = {}
+    
+    def add_var(v):
+        if v.data is not None and not isinstance(v, Parameter):
+            arrays[id(v.data)] = v.data.nbytes
+            
+    add_var(output)
+    while funcs:
+        f = funcs.pop()
+        for x in f.inputs:
+            add_var(x)
+            if x.creator is not None and x.creator not in seen_set:
+                funcs.append(x.creator)
+                seen_set.add(x.creator)
+    return sum(arrays.values())
+
 def plot_dot_graph(output, verbose=True, to_file='graph.png'):
     dot_graph = get_dot_graph(output, verbose)
     
@@ -140,6 +170,105 @@ def max_backward_shape(x, axis):
     shape = [s if ax not in axis else 1 for ax, s in enumerate(x.shape)]
     return shape
     
+def checkpoint_segments(sizes, budget):
+    """Split layers into checkpoint segments that fit a memory budget.
+    With k segments of a n-layer stack, backward keeps the k segment inputs
+    plus the activations of one segment being recomputed, which is smallest
+    around k = sqrt(n).
+    Args:
+        sizes (list of int): Activation bytes produced by each layer.
+        budget (int): Activation memory budget in bytes.
+    Returns:
+        list or None: (start, end) layer ranges, or None if every
+            activation fits in the budget without checkpointing.
+    """
+    n = len(sizes)
+    if n < 2 or sum(sizes) <= budget:
+        return None
+    
+    def split(k):
+        step = -(-n // k) # ceil(n / k)
+        return [(i, min(i + step, n)) for i in range(0, n, step)]
+    
+    def memory(segments):
+        kept = sum(sizes[start - 1] for start, _ in segments if start > 0)
+        return kept + max(sum(sizes[start:end]) for start, end in segments)
+    
+    plans = [split(k) for k in range(2, n + 1)]
+    for segments in plans: # 세그먼트 수가 적은 것부터 (재계산 경계가 적음)
+        if memory(segments) <= budget:
+            return segments
+    return min(plans, key=memory)
+
+# =============================================================================
+# Flat array file (Layer.save_weights, snapshots)
+# MAGIC | 헤더 길이(uint64) | JSON 헤더 {이름: dtype, shape, offset} | 배열들
+# 데이터 영역과 각 배열은 ARRAYS_ALIGN 바이트 경계에서 시작한다 (memmap 뷰가 정렬되도록)
+# =============================================================================
+ARRAYS_MAGIC = b'DZWEIGHT'
+ARRAYS_ALIGN = 64
+
+def _align(n):
+    return -(-n // ARRAYS_ALIGN) * ARRAYS_ALIGN
+
+def save_arrays(path, arrays):
+    """Write a dict of ndarrays to `path` in the flat, aligned format.
+    The file is written next to `path` and renamed, so an interrupted save
+    leaves the old file intact.
+    Args:
+        path (str): Output file.
+        arrays (dict): {name: ndarray}.
+    """
+    # ascontiguousarray는 0차원 배열을 1차원으로 바꾸므로 np.require로 shape 유지
+    arrays = {key: np.require(arrays[key], requirements='C') for key in sorted(arrays)}
+    index, offset = {}, 0
+    for key, data in arrays.items():
+        index[key] = {'dtype': data.dtype.str, 'shape': list(data.shape),
+                      'offset': offset}
+        offset = _align(offset + data.nbytes)
+    header = json.dumps(index).encode()
+    data_start = _align(len(ARRAYS_MAGIC) + 8 + len(header))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(ARRAYS_MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for key, data in arrays.items():
+            if data.nbytes == 0:
+                continue
+            f.seek(data_start + index[key]['offset'])
+            f.write(data.reshape(-1).view(np.uint8))
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+def load_arrays(path, mmap_mode='c'):
+    """Map a file written by save_arrays.
+    Returns:
+        dict: {name: ndarray} views of one np.memmap of the file.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(ARRAYS_MAGIC)) != ARRAYS_MAGIC:
+            raise ValueError('{} is not an array file'.format(path))
+        header_len = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        index = json.loads(f.read(header_len))
+    data_start = _align(len(ARRAYS_MAGIC) + 8 + header_len)
+    if not index:
+        return {}
+    if os.path.getsize(path) > data_start:
+        buf = np.memmap(path, dtype=np.uint8, mode=mmap_mode, offset=data_start)
+    else: # 크기 0인 배열만 있으면 mmap할 데이터가 없다
+        buf = np.zeros(0, dtype=np.uint8)
+
+    arrays = {}
+    for key, entry in index.items():
+        dtype = np.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        start = entry['offset']
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        arrays[key] = buf[start:start + nbytes].view(dtype).reshape(shape)
+    return arrays
+
 def show_progress(block_num, block_size, total_size):
     bar_template = "\r[{}] {:.2f}%"
 
@@ -0,0 +1,36 @@
+if '__file__' in globals():
+    import os, sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+import numpy as np
+import dezero.functions as F
+from dezero import Parameter
+from dezero.models import MLP
+from dezero.static import StaticGraph, Tape
+
+class FusedStaticGraphTest(unittest.TestCase):
+    def test_first_call(self):
+        np.random.seed(0)
+        x = np.random.randn(8, 10)
+        t = np.random.randint(0, 3, size=8)
+        model = MLP((10, 3), activation=F.sigmoid_simple)
+        static = StaticGraph(model, F.softmax_cross_entropy, fuse=True)
+        y, loss = static(x, t) # 캡처 직후 backward
+
+        expected = static.eager(x, t)[1]
+        self.assertTrue(np.allclose(loss.data, expected.data))
+        grads = [p.grad.data.copy() for p in model.params()]
+        y, loss = static(x, t) # 재생
+        for p, g in zip(model.params(), grads):
+            self.assertTrue(np.allclose(p.grad.data, g))
+
+    def test_backward_before_forward(self):
+        x = Parameter(np.random.rand(5, 4))
+        tape = Tape(F.sum(F.sigmoid_simple(x) * 2 + 1), fuse=True)
+        tape.backward()
+        s = 1 / (1 + np.exp(-x.data))
+        self.assertTrue(np.allclose(x.grad.data, 2 * s * (1 - s)))
+
+if __name__ == '__main__':
+    unittest.main()